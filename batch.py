@@ -0,0 +1,199 @@
+from concurrent.futures import ThreadPoolExecutor
+import argparse
+import json
+import logging
+import os
+
+from config import setupFromEnv
+from fantasy import Fantasy
+from snapshot import seasonCompleted
+from transport import ConnectionPool
+from tracing import span
+
+CACHE_DIR = "league_cache"
+
+logger = logging.getLogger(__name__)
+
+# bumped whenever the summaries change, so completed seasons cached before are loaded again;
+# 2: the final week of completed seasons and playoff byes are included
+CACHE_VERSION = 2
+
+# the per-team metrics that go into the comparison tables, with their column names
+TEAM_METRICS = {
+    'avgScores': 'avgScore',
+    'scoreStdDev': 'scoreStdDev',
+    'avgPosRanks': 'avgPosRank',
+    'avgPosRanksEntireTeam': 'avgPosRankEntireTeam',
+    'posRanksStdDev': 'posRankStdDev'
+}
+
+
+def cachePath(leagueId, year, cacheDir=CACHE_DIR):
+    return os.path.join(cacheDir, str(leagueId) + "_" + str(year) + ".json")
+
+
+def loadLeague(leagueId, year, cacheDir=CACHE_DIR):
+    """
+    Returns the metrics summary of one league season. Completed seasons are read from the local cache
+    when they are there and written to it when they are not; the current season is always loaded from ESPN.
+
+    Parameters:
+        leagueId (int): the ESPN league id
+        year (int): the season
+        cacheDir (str): the cache directory
+
+    Returns:
+        summary (dict): the output of Fantasy.summary() with the league id and year added
+    """
+
+    path = cachePath(leagueId, year, cacheDir)
+    completed = seasonCompleted(year)
+
+    if completed and os.path.exists(path):
+        with open(path) as f:
+            cached = json.load(f)
+        if cached.get('cacheVersion') == CACHE_VERSION:
+            return cached
+
+    with span("batch league", leagueId=leagueId, year=year):
+        summary = Fantasy(leagueId=leagueId, year=year).summary()
+
+    summary['leagueId'] = leagueId
+    summary['year'] = year
+    summary['cacheVersion'] = CACHE_VERSION
+
+    if completed:
+        os.makedirs(cacheDir, exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(summary, f)
+
+    return summary
+
+
+def loadLeagues(leagues, workers=4, rate=5, cacheDir=CACHE_DIR):
+    """
+    Loads many league seasons concurrently. All of their requests share one pooled HTTP session
+    and one global rate limit. A league season that fails to load (bad id, private league, replay miss)
+    is logged and reported, and does not stop the others.
+
+    Parameters:
+        leagues (list): the (league_id, year) pairs to load
+        workers (int): the number of leagues loaded at the same time
+        rate (float): the maximum number of requests per second across all leagues
+        cacheDir (str): the cache directory for completed seasons
+
+    Returns:
+        summaries (list): the summary of each league season that loaded, in the order given
+        failed (list): ((league_id, year), error) for each league season that did not load
+    """
+
+    summaries = []
+    failed = []
+
+    with ConnectionPool(size=workers, rate=rate, burst=workers):
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(loadLeague, leagueId, year, cacheDir) for leagueId, year in leagues]
+            for league, future in zip(leagues, futures):
+                try:
+                    summaries.append(future.result())
+                except Exception as error:
+                    logger.warning("Could not load league %s (%s): %s", league[0], league[1], error)
+                    failed.append((league, error))
+
+    return summaries, failed
+
+
+def teamTable(summaries):
+    """
+    Returns a table with one row per team per league season and one column per metric.
+
+    Parameters:
+        summaries (list): the league season summaries
+
+    Returns:
+        table (DataFrame): the team comparison table
+    """
+
+    import pandas as pd
+
+    rows = []
+
+    for summary in summaries:
+        for team in summary['avgScores']:
+            row = {'leagueId': summary['leagueId'], 'year': summary['year'], 'team': team}
+            for metric, column in TEAM_METRICS.items():
+                row[column] = summary[metric].get(team)
+            rows.append(row)
+
+    return pd.DataFrame(rows)
+
+
+def leagueTable(summaries):
+    """
+    Returns a table with one row per league season comparing the leagues as a whole: the league-wide
+    average score, how spread out the teams' averages are and the best and worst team by average score.
+
+    Parameters:
+        summaries (list): the league season summaries
+
+    Returns:
+        table (DataFrame): the league comparison table
+    """
+
+    teams = teamTable(summaries)
+    if teams.empty:
+        return teams
+
+    grouped = teams.groupby(['leagueId', 'year'])
+
+    table = grouped.agg(
+        teams=('team', 'count'),
+        avgScore=('avgScore', 'mean'),
+        avgScoreSpread=('avgScore', 'std'),
+        avgScoreStdDev=('scoreStdDev', 'mean'),
+        avgPosRank=('avgPosRank', 'mean')
+    )
+    table['bestTeam'] = grouped.apply(lambda group: group.loc[group['avgScore'].idxmax(), 'team'])
+    table['worstTeam'] = grouped.apply(lambda group: group.loc[group['avgScore'].idxmin(), 'team'])
+
+    return table.reset_index()
+
+
+def parseLeague(text):
+    leagueId, _, year = text.partition(":")
+    if not year:
+        raise argparse.ArgumentTypeError("expected LEAGUE_ID:YEAR, got " + repr(text))
+    return int(leagueId), int(year)
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Analyze many fantasy leagues and seasons at once")
+    parser.add_argument("leagues", nargs="+", type=parseLeague, help="LEAGUE_ID:YEAR pairs")
+    parser.add_argument("--workers", type=int, default=4, help="leagues loaded at the same time")
+    parser.add_argument("--rate", type=float, default=5, help="maximum ESPN requests per second")
+    parser.add_argument("--cache-dir", default=CACHE_DIR, help="where completed seasons are cached")
+    parser.add_argument("--output", help="write the team table to this CSV file")
+    args = parser.parse_args()
+
+    setupFromEnv()
+
+    summaries, failed = loadLeagues(args.leagues, workers=args.workers, rate=args.rate, cacheDir=args.cache_dir)
+
+    teams = teamTable(summaries)
+    leagues = leagueTable(summaries)
+
+    print("Leagues:")
+    print(leagues.to_string(index=False))
+    print()
+    print("Teams:")
+    print(teams.to_string(index=False))
+
+    if args.output:
+        teams.to_csv(args.output, index=False)
+
+    if failed:
+        print()
+        print("Not loaded:")
+        for (leagueId, year), error in failed:
+            print("    " + str(leagueId) + ":" + str(year) + " - " + str(error))
@@ -0,0 +1,237 @@
+import argparse
+import json
+import time
+from math import log
+
+# draw into memory so plot preparation can be timed without opening windows
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+
+from fantasy import Fantasy
+from synthetic import makeLeagues
+
+# the size every dimension sits at while another one is varied
+BASE_SIZE = {'teams': 10, 'roster': 16, 'weeks': 14, 'seasons': 1}
+
+# the values each dimension is swept through; each sweep spans well over MIN_FIT_RATIO so the
+# growth can be fitted away from the smallest sizes
+SWEEPS = {
+    'teams': [4, 8, 16, 32, 64],
+    'roster': [12, 24, 48, 96],
+    'weeks': [2, 4, 8, 14, 18],
+    'seasons': [1, 2, 4, 8]
+}
+
+# a growth exponent above this is reported as superlinear
+SUPERLINEAR = 1.5
+
+# the growth is only fitted, and flagged, over at least this many sizes spanning at least this ratio,
+# otherwise timing noise reads as growth
+MIN_FIT_POINTS = 3
+MIN_FIT_RATIO = 4
+
+
+def timeCall(function, repeats):
+    """
+    Returns the best wall time of `repeats` calls of function, in seconds.
+    The function is called once untimed first so one-off setup costs are left out.
+    """
+
+    function()
+
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def benchmarkFantasy(fantasy, repeats):
+    """
+    Times every get* metric, the lineup extraction and the plot preparation of a Fantasy object.
+
+    Parameters:
+        fantasy (Fantasy): the Fantasy object to measure
+        repeats (int): the number of times each call is repeated, keeping the best time
+
+    Returns:
+        timings (dict): dictionary with the phase name as the key and the time in seconds as the value
+    """
+
+    timings = {}
+
+    for name in sorted(dir(Fantasy)):
+        if name.startswith('get'):
+            timings[name] = timeCall(getattr(fantasy, name), repeats)
+
+    firstTeam = next(iter(fantasy.scores))
+
+    for name in sorted(dir(Fantasy)):
+        if name.startswith('plot'):
+            method = getattr(fantasy, name)
+            if name == 'plotScoresOverTime':
+                timings[name] = timeCall(lambda: (method(firstTeam), plt.close('all')), repeats)
+            else:
+                timings[name] = timeCall(lambda: (method(), plt.close('all')), repeats)
+
+    return timings
+
+
+def benchmarkSize(teams, roster, weeks, seasons, repeats, seed=0):
+    """
+    Builds synthetic leagues of the given size and times Fantasy on them. Each phase is summed over the seasons.
+
+    Parameters:
+        teams (int): the number of teams
+        roster (int): the number of players on each roster
+        weeks (int): the number of weeks
+        seasons (int): the number of seasons
+        repeats (int): the number of times each call is repeated
+        seed (int): the random seed
+
+    Returns:
+        timings (dict): dictionary with the phase name as the key and the time in seconds as the value
+    """
+
+    timings = {}
+
+    for league in makeLeagues(teams, roster, weeks, seasons, seed=seed):
+        seasonTimings = {}
+        seasonTimings['Fantasy()'] = timeCall(lambda: Fantasy(league), repeats)
+
+        fantasy = Fantasy(league)
+        seasonTimings.update(benchmarkFantasy(fantasy, repeats))
+
+        # fold the last week in again, the way a weekly refresh would
+        lastWeek = league.box_scores(league.current_week)
+        seasonTimings['addWeek'] = timeCall(lambda: fantasy.addWeek(lastWeek), 1)
+
+        for phase in seasonTimings:
+            timings[phase] = timings.get(phase, 0.0) + seasonTimings[phase]
+
+    return timings
+
+
+def growthExponent(sizes, times):
+    """
+    Returns the least squares slope of log(time) against log(size), i.e. k in time ~ size^k.
+    """
+
+    points = [(log(size), log(max(t, 1e-9))) for size, t in zip(sizes, times)]
+    meanX = sum(x for x, _ in points) / len(points)
+    meanY = sum(y for _, y in points) / len(points)
+    numerator = sum((x - meanX) * (y - meanY) for x, y in points)
+    denominator = sum((x - meanX) ** 2 for x, _ in points)
+
+    return numerator / denominator if denominator else 0.0
+
+
+def fitStart(sizes):
+    """
+    Returns the index of the first size to fit the growth from: the largest sizes that still give
+    MIN_FIT_POINTS points spanning MIN_FIT_RATIO, where fixed per-call overhead no longer hides the growth.
+    Falls back to every size when no such range exists.
+    """
+
+    for start in range(len(sizes) - MIN_FIT_POINTS, -1, -1):
+        if sizes[-1] / sizes[start] >= MIN_FIT_RATIO:
+            return start
+    return 0
+
+
+def reliableFit(sizes):
+    """
+    Returns whether the sizes are enough to fit, and flag, a growth exponent.
+    """
+
+    return len(sizes) >= MIN_FIT_POINTS and sizes[-1] / sizes[0] >= MIN_FIT_RATIO
+
+
+def runSweeps(sweeps, repeats):
+    """
+    Varies one dimension at a time around BASE_SIZE and times every phase at each size.
+
+    Parameters:
+        sweeps (dict): dictionary with the dimension as the key and the list of sizes as the value
+        repeats (int): the number of times each call is repeated
+
+    Returns:
+        results (dict): dictionary with the dimension as the key and {'sizes': [...], 'timings': [...]} as the value
+    """
+
+    results = {}
+
+    for dimension in sweeps:
+        results[dimension] = {'sizes': [], 'timings': []}
+        for size in sweeps[dimension]:
+            config = dict(BASE_SIZE)
+            config[dimension] = size
+            print("Benchmarking", ", ".join(key + "=" + str(config[key]) for key in config), "...")
+            results[dimension]['sizes'].append(size)
+            results[dimension]['timings'].append(benchmarkSize(repeats=repeats, **config))
+
+    return results
+
+
+def trendReport(results, baseline=None):
+    """
+    Prints, for each dimension, the time of every phase at the largest size and its growth exponent.
+    Phases that grow superlinearly are flagged, and if a baseline run is given the change against it is shown.
+
+    Parameters:
+        results (dict): the output of runSweeps()
+        baseline (dict): the output of an earlier runSweeps() to compare against (optional)
+
+    Returns: none
+    """
+
+    for dimension in results:
+        sizes = results[dimension]['sizes']
+        timings = results[dimension]['timings']
+
+        print()
+        print("Scaling with " + dimension + " (" + ", ".join(str(size) for size in sizes) + ")")
+        print("{:<30}{:>12}{:>10}{:>12}".format("Phase", "Time (ms)", "Growth", "vs. base"))
+
+        start = fitStart(sizes)
+        fitted = sizes[start:]
+        if not reliableFit(fitted):
+            print("(too few sizes to fit the growth reliably, nothing is flagged)")
+
+        for phase in timings[-1]:
+            times = [timing[phase] for timing in timings]
+            exponent = growthExponent(fitted, times[start:])
+
+            change = ""
+            if baseline is not None and dimension in baseline:
+                baseTime = baseline[dimension]['timings'][-1].get(phase)
+                if baseTime:
+                    change = "{:+.0%}".format(times[-1] / baseTime - 1)
+
+            flag = "  superlinear" if exponent > SUPERLINEAR and reliableFit(fitted) else ""
+            print("{:<30}{:>12.3f}{:>10.2f}{:>12}{}".format(phase, times[-1] * 1000, exponent, change, flag))
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Benchmark the Fantasy analytics on synthetic leagues")
+    parser.add_argument("--dimensions", nargs="+", choices=list(SWEEPS), default=list(SWEEPS), help="the dimensions to sweep")
+    parser.add_argument("--repeats", type=int, default=5, help="repeats per call, the best time is kept")
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="compare against the results in this JSON file")
+    args = parser.parse_args()
+
+    results = runSweeps({dimension: SWEEPS[dimension] for dimension in args.dimensions}, args.repeats)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    trendReport(results, baseline)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
@@ -0,0 +1,49 @@
+from datetime import date
+from dotenv import load_dotenv
+import os
+
+# Load environment variables from .env file
+load_dotenv()
+
+league_id = os.getenv("LEAGUE_ID")
+espn_s2 = os.getenv("ESPN_S2")
+swid = os.getenv("SWID")
+
+
+def currentSeason(today=None):
+    """
+    Returns the latest NFL season that has started. Seasons start in September, so until then it is the
+    previous year's season (whose playoffs run into January).
+
+    Parameters:
+        today (date): the date to check against (optional, defaults to today)
+
+    Returns:
+        season (int): the season
+    """
+
+    today = today or date.today()
+    return today.year if today.month >= 9 else today.year - 1
+
+
+# the season every script and class uses unless it is given one; FANTASY_SEASON overrides it
+DEFAULT_SEASON = int(os.getenv("FANTASY_SEASON") or currentSeason())
+
+
+def setupFromEnv():
+    """
+    Prepares a run as the environment asks: records or replays ESPN responses if ESPN_TRANSPORT is set
+    (requests is only imported then) and times each phase if FANTASY_TRACE is set.
+    Every entry point calls it once before it loads anything; calling it again does nothing.
+
+    Parameters: none
+
+    Returns: none
+    """
+
+    if os.getenv("ESPN_TRANSPORT", "live") != "live":
+        from transport import installFromEnv
+        installFromEnv()
+
+    from tracing import enableFromEnv
+    enableFromEnv()
@@ -1,6 +1,8 @@
+import os
+import pickle
+
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
 
 import tensorflow as tf
 from tensorflow import keras
@@ -11,11 +13,51 @@ from sklearn.preprocessing import MinMaxScaler
 from sklearn.preprocessing import LabelEncoder
 from sklearn.model_selection import train_test_split
 
-from keras.callbacks import EarlyStopping
+from keras.callbacks import EarlyStopping, Callback
 from keras.regularizers import l2
 from keras.layers import Dropout
 
-df = pd.read_csv("player_stats.csv", index_col=0)
+from config import setupFromEnv, DEFAULT_SEASON
+from tracing import span
+
+setupFromEnv()
+
+
+class EpochTimer(Callback):
+    """
+    Keras callback that records each training epoch as a span. An epoch that is still open when
+    training ends or fails is closed, so the spans around model.fit stay balanced.
+    """
+
+    epochSpan = None
+
+    def on_epoch_begin(self, epoch, logs=None):
+        self.epochSpan = span("epoch", epoch=epoch)
+        self.epochSpan.__enter__()
+
+    def on_epoch_end(self, epoch, logs=None):
+        self.close()
+
+    def on_train_end(self, logs=None):
+        self.close()
+
+    def close(self):
+        if self.epochSpan is not None:
+            self.epochSpan.__exit__(None, None, None)
+            self.epochSpan = None
+
+
+# FANTASY_DATASET=warehouse reads the stats make_dataset.py stored for DEFAULT_SEASON from the warehouse
+# instead of player_stats.csv, in the same layout
+if os.getenv("FANTASY_DATASET") == "warehouse":
+    from warehouse import Warehouse, Between
+
+    with span("read warehouse"):
+        with Warehouse() as warehouse:
+            df = warehouse.playerStats(DEFAULT_SEASON, weeks=Between(1, 18))
+else:
+    with span("read player_stats.csv"):
+        df = pd.read_csv("player_stats.csv", index_col=0)
 
 # drop the rows where position is "QB" or "K"
 df = df[df.position != 'QB']
@@ -39,10 +81,11 @@ for col in df.columns:
 # drop the rows with 25% or more missing values
 df = df.dropna(thresh=df.shape[1] * 0.50, axis=0)
 
-df.to_csv("player_stats_trimmed.csv")
+with span("write player_stats_trimmed.csv"):
+    df.to_csv("player_stats_trimmed.csv")
 
-# split the dataframe into X and y
-X = df.loc[:, ~df.columns.str.startswith('14_')]
+# split the dataframe into X and y (the player's name identifies the row, it is not a feature)
+X = df.loc[:, ~df.columns.str.startswith('14_')].drop(columns=['fullName'])
 y = df['14_pointsScored']
 
 # # split X and y into training and testing sets
@@ -75,23 +118,39 @@ model.compile(optimizer='adam', loss='mean_squared_error')
 early_stopping = EarlyStopping(monitor='val_loss', patience=5)
 
 # Fit the model to the training data
-history = model.fit(
-    X_train_scaled, y_train,
-    validation_split=0.2,
-    epochs=100,
-    callbacks=[early_stopping],
-    batch_size=32,  
-    verbose=1
-)
+epoch_timer = EpochTimer()
+
+with span("model.fit"):
+    try:
+        history = model.fit(
+            X_train_scaled, y_train,
+            validation_split=0.2,
+            epochs=100,
+            callbacks=[early_stopping, epoch_timer],
+            batch_size=32,  
+            verbose=1
+        )
+    finally:
+        # Keras does not call on_train_end when fit raises
+        epoch_timer.close()
 
 # Evaluate the model
-train_loss = model.evaluate(X_train_scaled, y_train, verbose=0)
-test_loss = model.evaluate(X_test_scaled, y_test, verbose=0)
+with span("model.evaluate"):
+    train_loss = model.evaluate(X_train_scaled, y_train, verbose=0)
+    test_loss = model.evaluate(X_test_scaled, y_test, verbose=0)
 
 print(f'Train Loss: {train_loss}')
 print(f'Test Loss: {test_loss}')
 
-# Plot the validation and training loss
+# Save the model, the scaler, the feature columns and the position classes so projections.py can score players without retraining
+with span("save model"):
+    model.save("player_model.keras")
+    with open("player_scaler.pkl", "wb") as f:
+        pickle.dump({'scaler': scaler, 'columns': list(X.columns), 'positions': list(label.classes_)}, f)
+
+# Plot the validation and training loss (matplotlib is only imported once training is done)
+import matplotlib.pyplot as plt
+
 plt.plot(history.history['loss'])
 plt.plot(history.history['val_loss'])
 plt.title('Model Loss')
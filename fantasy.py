@@ -1,28 +1,67 @@
-from espn_api.football import League
-from numpy import std, mean
-import matplotlib.pyplot as plt
-from dotenv import load_dotenv
-import os
+from config import league_id, espn_s2, swid, DEFAULT_SEASON
+from running_stats import RunningStats, RollingStats
+from tracing import span, traced
+from snapshot import seasonCompleted, snapshotLeague, snapshotTeams, snapshotBoxScores, STARTING_EXCLUDED
+from warehouse import Warehouse, WAREHOUSE_PATH
+import logging
+import sqlite3
 
-# Load environment variables from .env file
-load_dotenv()
+# espn_api, numpy and matplotlib take most of a second to import, so they are only imported by the
+# functions below the first time a league is loaded, a metric is computed or a plot is drawn.
 
-league_id = os.getenv("LEAGUE_ID")
-espn_s2 = os.getenv("ESPN_S2")
-swid = os.getenv("SWID")
+# number of most recent weeks covered by the rolling score statistics
+ROLLING_WINDOW = 4
+
+logger = logging.getLogger(__name__)
+
+
+def connectLeague(leagueId=None, year=DEFAULT_SEASON):
+    """
+    Returns the espn_api League for the given league id (LEAGUE_ID by default) and season (DEFAULT_SEASON by default).
+    """
+
+    from espn_api.football import League
+
+    with span("League()"):
+        return League(
+            league_id=leagueId or league_id,
+            year=year, espn_s2=espn_s2,
+            swid=swid,
+            debug=False
+        )
+
+
+def mean(values):
+    import numpy
+    return numpy.mean(values)
+
+
+def std(values):
+    import numpy
+    return numpy.std(values)
+
+
+def pyplot():
+    import matplotlib.pyplot
+    return matplotlib.pyplot
 
 
 class Fantasy:
     """
     Class that contains all of the fantasy football data and methods.
 
+    The league, rosters and boxscores are kept as the compact records from snapshot.py rather than
+    the espn_api objects, which are released as soon as they have been copied.
+
     Attributes:
-        league (League)
-            - the league
+        league (LeagueRecord)
+            - the league id, season and current week of the league
+        completed (bool)
+            - whether the season is over, in which case the current week's scores are final
         rosters (list)
-            - the rosters of the league
+            - the rosters of the league (TeamRecords)
         all_boxscores (list)
-            - all of the boxscores for each week up until the current week
+            - all of the boxscores for each week up until the current week (BoxScoreRecords)
         scores (dict)
             - the scores of each team
         startingLineups (dict)
@@ -37,6 +76,16 @@ class Fantasy:
             - the average scores of each team
         scoreStdDev (dict)
             - the standard deviation of the scores of each team
+        scoreStats (dict)
+            - the running score statistics of each team, used to fold in new weeks
+        rollingScores (dict)
+            - the score statistics of each team over the last ROLLING_WINDOW weeks
+        weeklyRanks (list)
+            - for each completed week, the rank of each team's score that week
+        liveScores (dict)
+            - the live scores of the current week, filled in by updateLiveScores()
+        liveRanks (dict)
+            - the rank of each team's live score in the current week
 
 
     Methods:
@@ -48,6 +97,15 @@ class Fantasy:
         getScores()
         getTeamsScoreStdDev()
         getTeamsAverageScore()
+        getScoreStats()
+        getRollingScores()
+        getWeeklyRanks()
+        rankWeek()
+        rankScores()
+        addWeek()
+        updateLiveScores()
+        summary()
+        saveToWarehouse()
         plotAvgPosRanks()
         plotPosRanksStdDev()
         plotAvgScores()
@@ -57,19 +115,27 @@ class Fantasy:
         debug()
     """
 
-    def __init__(self):
+    def __init__(self, league=None, leagueId=None, year=DEFAULT_SEASON):
 
-        self.league = League(
-            league_id=league_id,
-            year=2025, espn_s2=espn_s2,
-            swid=swid,
-            debug=False
-        )
+        # any object with the League attributes Fantasy reads (teams, year, current_week, box_scores()) can
+        # be passed in, e.g. a synthetic league from synthetic.py or a stored one from Warehouse.league()
+        fromEspn = league is None
+        if fromEspn:
+            league = connectLeague(leagueId, year)
+
+        self.league = league
+
+        self.rosters = snapshotTeams(self.league.teams)
 
-        self.rosters = self.league.teams
-        
         self.all_boxscores = self.allBoxScores()
 
+        # nothing but the id, season and current week is read from the league after this, so keep
+        # only those and let the League and its Teams, Players and schedule go
+        self.league = snapshotLeague(league)
+        # a league rebuilt from the warehouse knows whether it was completed when it was saved
+        completed = getattr(league, 'completed', None)
+        self.completed = seasonCompleted(self.league.year) if completed is None else completed
+
         self.scores = self.getScores()
         self.lineups = self.getLineups()
         self.startingLineups = self.getStartingLineups()
@@ -82,10 +148,27 @@ class Fantasy:
         self.avgScores = self.getTeamsAverageScore()
         self.scoreStdDev = self.getTeamsScoreStdDev()
 
+        self.scoreStats = self.getScoreStats()
+        self.rollingScores = self.getRollingScores()
+        self.weeklyRanks = self.getWeeklyRanks()
+
+        self.liveScores = {}
+        self.liveRanks = {}
+
+        # keep a copy of every league loaded from ESPN in the local warehouse; the league is loaded
+        # either way, so a warehouse that cannot be written (read-only directory, locked file) only warns
+        if fromEspn and WAREHOUSE_PATH:
+            try:
+                self.saveToWarehouse()
+            except (sqlite3.Error, OSError) as error:
+                logger.warning("Could not save league %s (%s) to the warehouse: %s", self.league.league_id, self.league.year, error)
+
     
+    @traced()
     def allBoxScores(self):
         """
         Returns a list of all of the boxscores for each week up until the current week.
+        Each week is copied into BoxScoreRecords as soon as it is fetched, so only one week of espn_api objects is alive at a time.
 
         Parameters: none
 
@@ -93,11 +176,15 @@ class Fantasy:
             all_boxscores (list): list of all of the boxscores for each week up until the current week
         """
 
+        teams = {team.team_abbrev: team for team in self.rosters}
+
         all_boxscores = []
         for i in range(1, self.league.current_week + 1):
-            all_boxscores.append(self.league.box_scores(i))
+            with span("League.box_scores", week=i):
+                all_boxscores.append(snapshotBoxScores(self.league.box_scores(i), teams))
         return all_boxscores
 
+    @traced()
     def getStartingLineups(self):
         """
         Returns a dictionary with the team abbrev as the key and the starting lineup as the value.
@@ -111,21 +198,13 @@ class Fantasy:
 
         startingLineups = {}
 
-        for matchup in self.all_boxscores[self.league.current_week - 1]:
-            homeLineup = []
-            awayLineup = []
-            for player in matchup.home_lineup:
-                if player.slot_position != 'BE' and player.slot_position != 'IR':
-                    homeLineup.append(player)
-            for player in matchup.away_lineup:
-                if player.slot_position != 'BE' and player.slot_position != 'IR':
-                    awayLineup.append(player)
-            startingLineups[matchup.home_team.team_abbrev] = homeLineup
-            startingLineups[matchup.away_team.team_abbrev] = awayLineup
+        for team in self.lineups:
+            startingLineups[team] = self.lineups[team][0]
 
         return startingLineups
 
 
+    @traced()
     def getWholeLineup(self):
         """
         Returns a dictionary with the team abbrev as the key and the whole lineup as the value.
@@ -139,50 +218,55 @@ class Fantasy:
             
         wholeLineups = {}
 
-        for matchup in self.all_boxscores[self.league.current_week - 1]:
-            homeLineup = []
-            awayLineup = []
-            for player in matchup.home_lineup:
-                homeLineup.append(player)
-            for player in matchup.away_lineup:
-                awayLineup.append(player)
-            wholeLineups[matchup.home_team.team_abbrev] = homeLineup
-            wholeLineups[matchup.away_team.team_abbrev] = awayLineup
+        for team in self.lineups:
+            wholeLineups[team] = self.lineups[team][1]
 
         return wholeLineups
     
 
+    @traced()
     def getLineups(self):
         """
-        Returns a dictionary with the team abbrev as the key and an array containging two arrays as the value. The first array contains the starting lineup and the second array contains the whole lineup.
+        Returns a dictionary with the team abbrev as the key and a tuple containing two tuples as the value. The first tuple contains the starting lineup and the second tuple contains the whole lineup.
+        Teams without a matchup in the current week, e.g. eliminated in the playoffs, have no lineup and are left out of the position rank metrics.
+        The whole lineup is the current week's boxscore lineup itself, and startingLineups and wholeLineups share these tuples, so the players are never copied.
 
         Parameters: none
 
         Returns:
-        
+            lineups (dict): dictionary with the team abbrev as the key and (starting lineup, whole lineup) as the value
         """
 
         lineups = {}
 
         for matchup in self.all_boxscores[self.league.current_week - 1]:
-            homeStartingLineup = []
-            homeWholeLineup = []
-            awayStartingLineup = []
-            awayWholeLineup = []
-            for player in matchup.home_lineup:
-                if player.slot_position != 'BE' and player.slot_position != 'IR':
-                    homeStartingLineup.append(player)
-                homeWholeLineup.append(player)
-            for player in matchup.away_lineup:
-                if player.slot_position != 'BE' and player.slot_position != 'IR':
-                    awayStartingLineup.append(player)
-                awayWholeLineup.append(player)
-            lineups[matchup.home_team.team_abbrev] = [homeStartingLineup, homeWholeLineup]
-            lineups[matchup.away_team.team_abbrev] = [awayStartingLineup, awayWholeLineup]
+            for team, lineup in ((matchup.home_team, matchup.home_lineup), (matchup.away_team, matchup.away_lineup)):
+                if team is None:
+                    continue
+                startingLineup = tuple(player for player in lineup if player.slot_position not in STARTING_EXCLUDED)
+                lineups[team.team_abbrev] = (startingLineup, lineup)
 
         return lineups
 
 
+    def rosterPosRanks(self, team, lineup):
+        """
+        Returns the position ranks of the players on a team's roster who are also in the given lineup.
+
+        Parameters:
+            team (TeamRecord): the team
+            lineup (tuple): the lineup to match the roster against by player name
+
+        Returns:
+            posRanks (list): the roster position ranks of the matching players
+        """
+
+        names = {player.name for player in lineup}
+
+        return [player.posRank for player in team.roster if player.name in names]
+
+
+    @traced()
     def getAvgPosRanks(self):
         """
         Returns a dictionary with the team abbrev as the key and the average position rank as the value.
@@ -194,19 +278,15 @@ class Fantasy:
             avgPosRanks (dict): dictionary with the team abbrev as the key and the average position rank as the value
         """
 
-        posRanks = {}
         avgPosRanks = {}
 
         for team in self.rosters:
-            posRanks[team.team_abbrev] = []
-            for player in team.roster:
-                for startingPlayer in self.startingLineups[team.team_abbrev]:
-                    if player.name == startingPlayer.name:
-                        posRanks[team.team_abbrev].append(player.posRank)
-            avgPosRanks[team.team_abbrev] = mean(posRanks[team.team_abbrev])
+            if team.team_abbrev in self.startingLineups:
+                avgPosRanks[team.team_abbrev] = mean(self.rosterPosRanks(team, self.startingLineups[team.team_abbrev]))
 
         return avgPosRanks
     
+    @traced()
     def getAvgPosRanksEntireTeam(self):
         """
         Returns a dictionary with the team abbrev as the key and the average position rank as the value.
@@ -217,21 +297,17 @@ class Fantasy:
             avgPosRanks (dict): dictionary with the team abbrev as the key and the average position rank as the value
         """
 
-        posRanks = {}
         avgPosRanks = {}
 
         for team in self.rosters:
-            posRanks[team.team_abbrev] = []
-            for player in team.roster:
-                for startingPlayer in self.wholeLineups[team.team_abbrev]:
-                    if player.name == startingPlayer.name:
-                        posRanks[team.team_abbrev].append(player.posRank)
-            avgPosRanks[team.team_abbrev] = mean(posRanks[team.team_abbrev])
+            if team.team_abbrev in self.wholeLineups:
+                avgPosRanks[team.team_abbrev] = mean(self.rosterPosRanks(team, self.wholeLineups[team.team_abbrev]))
 
         return avgPosRanks
 
 
 
+    @traced()
     def getPosRanksStdDev(self):
         """
         Returns a dictionary with the team abbrev as the key and the standard deviation of the position ranks as the value.
@@ -246,20 +322,18 @@ class Fantasy:
         posRanksStdDev = {}
 
         for team in self.rosters:
-            posRanks = []
-            for player in team.roster:
-                for startingPlayer in self.startingLineups[team.team_abbrev]:
-                    if player.name == startingPlayer.name:
-                        posRanks.append(player.posRank)
-                        
-            posRanksStdDev[team.team_abbrev] = std(posRanks)
+            if team.team_abbrev in self.startingLineups:
+                posRanksStdDev[team.team_abbrev] = std(self.rosterPosRanks(team, self.startingLineups[team.team_abbrev]))
 
         return posRanksStdDev
 
 
+    @traced()
     def getScores(self):
         """
         Returns a dictionary with the team abbrev as the key and an array of scores as the value.
+        The current week is left out while it is still in progress, i.e. unless the season is completed.
+        The missing team of a playoff bye gets no score.
 
         Parameters: none
 
@@ -270,20 +344,21 @@ class Fantasy:
 
         scores = {}
 
-        for team in self.league.teams:
+        for team in self.rosters:
             scores[team.team_abbrev] = []
 
-        for week in self.all_boxscores:
-            for boxscore in week:
-                scores[boxscore.home_team.team_abbrev].append(boxscore.home_score)
-                scores[boxscore.away_team.team_abbrev].append(boxscore.away_score)
+        weeks = self.all_boxscores if self.completed else self.all_boxscores[:-1]
 
-        for team in scores:
-            scores[team] = scores[team][:-1]
+        for week in weeks:
+            for boxscore in week:
+                for team, score in ((boxscore.home_team, boxscore.home_score), (boxscore.away_team, boxscore.away_score)):
+                    if team is not None:
+                        scores[team.team_abbrev].append(score)
 
         return scores
 
 
+    @traced()
     def getTeamsScoreStdDev(self):
         """
         Returns a dictionary with the team abbrev as the key and the standard deviation of the scores as the value.
@@ -302,6 +377,7 @@ class Fantasy:
         return scoreStdDev
 
 
+    @traced()
     def getTeamsAverageScore(self):
         """
         Returns a dictionary with the team abbrev as the key and the average score as the value.
@@ -319,6 +395,192 @@ class Fantasy:
             avgScores[team] = mean(self.scores[team])
 
         return avgScores
+
+
+    @traced()
+    def getScoreStats(self):
+        """
+        Returns a dictionary with the team abbrev as the key and the running statistics of the team's scores as the value.
+
+        Parameters: none
+
+        Returns:
+            scoreStats (dict): dictionary with the team abbrev as the key and a RunningStats of the scores as the value
+        """
+
+        scoreStats = {}
+
+        for team in self.scores:
+            scoreStats[team] = RunningStats(self.scores[team])
+
+        return scoreStats
+
+
+    @traced()
+    def getRollingScores(self):
+        """
+        Returns a dictionary with the team abbrev as the key and the statistics of the team's last ROLLING_WINDOW scores as the value.
+
+        Parameters: none
+
+        Returns:
+            rollingScores (dict): dictionary with the team abbrev as the key and a RollingStats of the recent scores as the value
+        """
+
+        rollingScores = {}
+
+        for team in self.scores:
+            rollingScores[team] = RollingStats(ROLLING_WINDOW, self.scores[team][-ROLLING_WINDOW:])
+
+        return rollingScores
+
+
+    @traced()
+    def getWeeklyRanks(self):
+        """
+        Returns a list with one dictionary per completed week. Each dictionary has the team abbrev as the key
+        and the rank of the team's score that week as the value, where 1 is the highest score of the week.
+        The current week counts as completed once the season is.
+
+        Parameters: none
+
+        Returns:
+            weeklyRanks (list): list of dictionaries with the team abbrev as the key and the weekly rank as the value
+        """
+
+        weeklyRanks = []
+
+        weeks = self.all_boxscores if self.completed else self.all_boxscores[:-1]
+
+        for week in weeks:
+            weeklyRanks.append(self.rankWeek(week))
+
+        return weeklyRanks
+
+
+    def rankWeek(self, boxscores):
+        """
+        Returns a dictionary with the team abbrev as the key and the rank of the team's score in the given week as the value.
+
+        Parameters:
+            boxscores (list): the boxscores of a single week
+
+        Returns:
+            ranks (dict): dictionary with the team abbrev as the key and the rank as the value
+        """
+
+        weekScores = {}
+
+        for boxscore in boxscores:
+            for team, score in ((boxscore.home_team, boxscore.home_score), (boxscore.away_team, boxscore.away_score)):
+                if team is not None:
+                    weekScores[team.team_abbrev] = score
+
+        return self.rankScores(weekScores)
+
+
+    def rankScores(self, weekScores):
+        """
+        Returns a dictionary with the team abbrev as the key and the rank of the team's score as the value.
+
+        Parameters:
+            weekScores (dict): dictionary with the team abbrev as the key and the team's score as the value
+
+        Returns:
+            ranks (dict): dictionary with the team abbrev as the key and the rank as the value
+        """
+
+        ranks = {}
+
+        for rank, team in enumerate(sorted(weekScores, key=weekScores.get, reverse=True), start=1):
+            ranks[team] = rank
+
+        return ranks
+
+
+    @traced()
+    def updateLiveScores(self, matchups):
+        """
+        Updates the current week's live scores and ranks from the matchups that changed since the last update.
+        Meant to be subscribed to a LiveScorer so only the changed matchups are touched.
+
+        Parameters:
+            matchups (list): the LiveMatchups that changed
+
+        Returns: none
+        """
+
+        for matchup in matchups:
+            self.liveScores[matchup.home_abbrev] = matchup.home_score
+            self.liveScores[matchup.away_abbrev] = matchup.away_score
+
+        self.liveRanks = self.rankScores(self.liveScores)
+
+
+    @traced()
+    def addWeek(self, boxscores, currentBoxscores=None, teams=None):
+        """
+        Folds a newly completed week into the score aggregates without rebuilding the Fantasy object.
+        Only the given week is read, so the cost is O(teams) instead of refetching and recomputing every week.
+
+        If currentBoxscores is given, it becomes the new current week: the lineups and position rank metrics
+        are rebuilt from it, and the completed week's final boxscores replace the in-progress ones.
+
+        The position ranks come from the rosters, so pass the league's current teams along with a new week
+        to pick up waiver moves and updated ranks; otherwise the rosters loaded at startup are kept.
+
+        Parameters:
+            boxscores (list): the final boxscores of the week that just finished
+            currentBoxscores (list): the boxscores of the new current week (optional)
+            teams (list): the league's teams with their current rosters (optional)
+
+        Returns: none
+        """
+
+        rostersChanged = teams is not None
+        if rostersChanged:
+            self.rosters = snapshotTeams(teams)
+
+        teams = {team.team_abbrev: team for team in self.rosters}
+        boxscores = snapshotBoxScores(boxscores, teams)
+
+        for boxscore in boxscores:
+            for record, score in ((boxscore.home_team, boxscore.home_score), (boxscore.away_team, boxscore.away_score)):
+                if record is None:
+                    continue
+
+                team = record.team_abbrev
+                if team not in self.scores:
+                    self.scores[team] = []
+                    self.scoreStats[team] = RunningStats()
+                    self.rollingScores[team] = RollingStats(ROLLING_WINDOW)
+
+                self.scores[team].append(score)
+                self.scoreStats[team].add(score)
+                self.rollingScores[team].add(score)
+
+                self.avgScores[team] = self.scoreStats[team].mean
+                self.scoreStdDev[team] = self.scoreStats[team].std
+
+        self.weeklyRanks.append(self.rankWeek(boxscores))
+
+        if currentBoxscores is not None:
+            # the last entry holds the in-progress boxscores of the week that just finished
+            self.all_boxscores[-1] = boxscores
+            self.all_boxscores.append(snapshotBoxScores(currentBoxscores, teams))
+            self.league.current_week = len(self.all_boxscores)
+
+            self.liveScores = {}
+            self.liveRanks = {}
+
+            self.lineups = self.getLineups()
+            self.startingLineups = self.getStartingLineups()
+            self.wholeLineups = self.getWholeLineup()
+
+        if currentBoxscores is not None or rostersChanged:
+            self.avgPosRanks = self.getAvgPosRanks()
+            self.avgPosRanksEntireTeam = self.getAvgPosRanksEntireTeam()
+            self.posRanksStdDev = self.getPosRanksStdDev()
     
 
     def playoffClinchers(self):
@@ -331,6 +593,43 @@ class Fantasy:
         """
     
 
+    def summary(self):
+        """
+        Returns every per-team metric in plain Python types, e.g. for caching or comparing leagues.
+
+        Parameters: none
+
+        Returns:
+            summary (dict): dictionary with the current week and, for each metric, a dictionary with the team abbrev as the key
+        """
+
+        return {
+            'currentWeek': self.league.current_week,
+            'scores': {team: [float(score) for score in self.scores[team]] for team in self.scores},
+            'avgScores': {team: float(value) for team, value in self.avgScores.items()},
+            'scoreStdDev': {team: float(value) for team, value in self.scoreStdDev.items()},
+            'avgPosRanks': {team: float(value) for team, value in self.avgPosRanks.items()},
+            'avgPosRanksEntireTeam': {team: float(value) for team, value in self.avgPosRanksEntireTeam.items()},
+            'posRanksStdDev': {team: float(value) for team, value in self.posRanksStdDev.items()}
+        }
+
+
+    @traced()
+    def saveToWarehouse(self, path=None):
+        """
+        Stores the league season's rosters, boxscores and lineups in the local warehouse.
+
+        Parameters:
+            path (str): the warehouse file (optional, defaults to WAREHOUSE_PATH)
+
+        Returns: none
+        """
+
+        with Warehouse(path) as warehouse:
+            warehouse.saveFantasy(self, self.league.league_id)
+
+
+    @traced()
     def plotAvgPosRanks(self):
         """
         Creates and plots a scatter plot of the avgPosRanks.
@@ -340,6 +639,8 @@ class Fantasy:
         Returns: none
         """
 
+        plt = pyplot()
+
         # create and plot a scatter plot of the avgPosRanks
         plt.figure()
         plt.scatter(self.avgPosRanks.keys(), self.avgPosRanks.values())
@@ -352,6 +653,7 @@ class Fantasy:
             plt.annotate(str(round(self.avgPosRanks[team], 1)), (team, self.avgPosRanks[team]))
 
 
+    @traced()
     def plotAvgPosRanksEntireTeam(self):
         """
         Creates and plots a scatter plot of the avgPosRanks.
@@ -361,6 +663,8 @@ class Fantasy:
         Returns: none
         """
 
+        plt = pyplot()
+
         # create and plot a scatter plot of the avgPosRanks
         plt.figure()
         plt.scatter(self.avgPosRanksEntireTeam.keys(), self.avgPosRanksEntireTeam.values())
@@ -373,6 +677,7 @@ class Fantasy:
             plt.annotate(str(round(self.avgPosRanksEntireTeam[team], 1)), (team, self.avgPosRanksEntireTeam[team]))
 
     
+    @traced()
     def plotPosRanksStdDev(self):
         """
         Creates and plots a scatter plot of the posRanksStdDev.
@@ -382,6 +687,8 @@ class Fantasy:
         Returns: none
         """
 
+        plt = pyplot()
+
         plt.figure()
         plt.scatter(self.posRanksStdDev.keys(), self.posRanksStdDev.values())
         plt.title("Standard Deviation of Position Ranks of Each Team (Week " + str(self.league.current_week) + ")")
@@ -393,6 +700,7 @@ class Fantasy:
             plt.annotate(str(round(self.posRanksStdDev[team], 1)), (team, self.posRanksStdDev[team]))
 
 
+    @traced()
     def plotAvgScores(self):
         """
         Plot box and whisker plot of each team's scores. Gets scores from self.scores[teamAbbrev]
@@ -402,14 +710,19 @@ class Fantasy:
 
         Returns: none
         """
+
+        plt = pyplot()
         
         plt.figure()
-        plt.boxplot(self.scores.values(), labels=self.scores.keys())
+        plt.boxplot(list(self.scores.values()))
+        # set the tick labels separately, boxplot's labels argument was renamed in newer matplotlib
+        plt.xticks(range(1, len(self.scores) + 1), list(self.scores.keys()))
         plt.title("Scores of Each Team (Week " + str(self.league.current_week) + ")")
         plt.xlabel("Team")
         plt.ylabel("Score")
 
 
+    @traced()
     def plotAvgScoresOnAllScores(self):
         """
         Plot each team's average score on top of their other scores in a scatter plot.
@@ -420,6 +733,8 @@ class Fantasy:
 
         Returns: none
         """
+
+        plt = pyplot()
         
         plt.figure()
         for team in self.scores:
@@ -430,6 +745,7 @@ class Fantasy:
         plt.ylabel("Score")
 
 
+    @traced()
     def plotScoreStdDev(self):
         """
         Creates and plots a scatter plot of the scoreStdDev.
@@ -439,6 +755,8 @@ class Fantasy:
         Returns: none
         """
 
+        plt = pyplot()
+
         plt.figure()
         plt.scatter(self.scoreStdDev.keys(), self.scoreStdDev.values())
         plt.title("Standard Deviation of Scores of Each Team (Week " + str(self.league.current_week) + ")")
@@ -450,6 +768,7 @@ class Fantasy:
             plt.annotate(str(round(self.scoreStdDev[team], 1)), (team, self.scoreStdDev[team]))
 
 
+    @traced()
     def plotScoresOverTime(self, teamAbbrev):
         """
         Plots the scores of a team over time. Gets scores from self.scores[teamAbbrev]
@@ -460,6 +779,8 @@ class Fantasy:
         Returns: none
         """
 
+        plt = pyplot()
+
         # plot the scores
         plt.figure()
         plt.plot(self.scores[teamAbbrev])
@@ -468,6 +789,7 @@ class Fantasy:
         plt.ylabel("Score")
 
     
+    @traced()
     def plotAllScoresOverTime(self):
         """
         Plots the scores of all teams over time in the same plot. There are many lines
@@ -479,6 +801,8 @@ class Fantasy:
         Returns: none
         """
 
+        plt = pyplot()
+
         # plot the scores
         plt.figure()
         for team in self.scores:
@@ -494,6 +818,8 @@ class Fantasy:
         Shows all of the plots.
         """
 
+        plt = pyplot()
+
         plt.show()
 
 
@@ -0,0 +1,394 @@
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from collections import namedtuple
+from threading import Thread, Event
+import argparse
+import hashlib
+import json
+import logging
+
+import requests
+from config import league_id, espn_s2, swid, setupFromEnv, DEFAULT_SEASON
+
+ESPN_URL = "https://lm-api-reads.fantasy.espn.com/apis/v3/games/ffl/seasons/{year}/segments/0/leagues/{league_id}"
+
+# the views needed to read every matchup's score and map team ids to abbreviations
+LIVE_VIEWS = ['mMatchupScore', 'mScoreboard', 'mTeam']
+
+# seconds to wait for a scoreboard response, independent of the polling interval
+REQUEST_TIMEOUT = 10
+
+logger = logging.getLogger(__name__)
+
+LiveMatchup = namedtuple('LiveMatchup', ['home_abbrev', 'away_abbrev', 'home_score', 'away_score'])
+
+
+class LiveScorer:
+    """
+    Class that polls the current week's box scores during game windows and pushes the matchups
+    whose scores changed to its subscribers.
+
+    Only the current week's scoreboard is requested, over one shared HTTP session. A poll whose
+    payload is unchanged (HTTP 304 or an identical body) is dropped before it is parsed. A poll that
+    fails (network error, error status or a malformed payload) is logged and polling carries on.
+
+    Attributes:
+        week (int)
+            - the week being polled
+        interval (float)
+            - the number of seconds between polls
+        timeout (float)
+            - the number of seconds to wait for each response
+        session (requests.Session)
+            - the HTTP session shared by every poll
+        matchups (dict)
+            - the latest LiveMatchup of each matchup, keyed by (home abbrev, away abbrev)
+        subscribers (list)
+            - the callbacks that receive the list of changed matchups
+        lastError (Exception)
+            - the error of the last poll, or None if it succeeded
+
+    Methods:
+        subscribe()
+        fetch()
+        poll()
+        run()
+        start()
+        stop()
+    """
+
+    def __init__(self, week, year=DEFAULT_SEASON, leagueId=None, interval=30, session=None, baseUrl=None, recordPath=None,
+                 timeout=REQUEST_TIMEOUT):
+
+        self.week = week
+        self.interval = interval
+        self.timeout = timeout
+        self.session = session if session is not None else requests.Session()
+        self.url = (baseUrl or ESPN_URL).format(year=year, league_id=leagueId or league_id)
+        self.recordPath = recordPath
+
+        if espn_s2 and swid:
+            self.session.cookies.update({'espn_s2': espn_s2, 'SWID': swid})
+
+        self.matchups = {}
+        self.subscribers = []
+        self.lastError = None
+
+        self._etag = None
+        self._digest = None
+        self._stopped = Event()
+        self._thread = None
+
+
+    def subscribe(self, callback):
+        """
+        Registers a callback that is called with the list of changed LiveMatchups after each poll that changed something.
+        Callbacks run on the polling thread.
+
+        Parameters:
+            callback (callable): the function to call with the changed matchups
+
+        Returns: none
+        """
+
+        self.subscribers.append(callback)
+
+
+    def fetch(self):
+        """
+        Requests the current week's scoreboard.
+
+        Parameters: none
+
+        Returns:
+            data (dict): the decoded payload, or None if it is unchanged since the last poll
+        """
+
+        headers = {'x-fantasy-filter': json.dumps({'schedule': {'filterMatchupPeriodIds': {'value': [self.week]}}})}
+        if self._etag is not None:
+            headers['If-None-Match'] = self._etag
+
+        response = self.session.get(
+            self.url,
+            params={'view': LIVE_VIEWS, 'scoringPeriodId': self.week},
+            headers=headers,
+            timeout=self.timeout
+        )
+
+        if response.status_code == 304:
+            return None
+        response.raise_for_status()
+
+        self._etag = response.headers.get('ETag')
+
+        digest = hashlib.sha1(response.content).hexdigest()
+        if digest == self._digest:
+            return None
+        self._digest = digest
+
+        if self.recordPath is not None:
+            with open(self.recordPath, 'ab') as f:
+                f.write(response.content.replace(b'\n', b'') + b'\n')
+
+        return response.json()
+
+
+    def poll(self):
+        """
+        Polls the scoreboard once and notifies the subscribers of the matchups whose scores changed.
+        Teams and matchups that are malformed are logged and skipped, and a subscriber that raises is
+        logged without keeping the others from being notified. Nothing is delivered once stop() is called.
+
+        Parameters: none
+
+        Returns:
+            changed (list): the LiveMatchups that changed since the last poll
+        """
+
+        data = self.fetch()
+        if data is None:
+            return []
+
+        if not isinstance(data, dict):
+            logger.warning("Ignoring a week %s scoreboard that is not a JSON object", self.week)
+            return []
+
+        abbrevs = {}
+        for team in _entries(data, 'teams'):
+            try:
+                abbrevs[team['id']] = team['abbrev']
+            except (KeyError, TypeError) as error:
+                logger.warning("Skipping a malformed team in the week %s scoreboard: %r", self.week, error)
+
+        changed = []
+
+        for matchup in _entries(data, 'schedule'):
+            try:
+                if matchup.get('matchupPeriodId') != self.week or 'away' not in matchup:
+                    continue
+                current = liveMatchup(matchup, abbrevs)
+            except (KeyError, TypeError, AttributeError) as error:
+                logger.warning("Skipping a malformed matchup in the week %s scoreboard: %r", self.week, error)
+                continue
+
+            key = (current.home_abbrev, current.away_abbrev)
+            if self.matchups.get(key) != current:
+                self.matchups[key] = current
+                changed.append(current)
+
+        if changed and not self._stopped.is_set():
+            for callback in self.subscribers:
+                try:
+                    callback(changed)
+                except Exception:
+                    logger.exception("Live scoring subscriber %r failed", callback)
+
+        return changed
+
+
+    def run(self, polls=None):
+        """
+        Polls every `interval` seconds until stop() is called or `polls` polls have been made.
+        Failed polls are logged and count towards `polls`; the next poll is made as usual.
+
+        Parameters:
+            polls (int): the number of polls to make (optional, defaults to polling until stopped)
+
+        Returns: none
+        """
+
+        count = 0
+        while not self._stopped.is_set():
+            try:
+                self.poll()
+                self.lastError = None
+            except (requests.RequestException, ValueError) as error:
+                # ValueError covers a payload that is not valid JSON
+                self.lastError = error
+                logger.warning("Live scoring poll of week %s failed: %s", self.week, error)
+            count += 1
+            if polls is not None and count >= polls:
+                break
+            self._stopped.wait(self.interval)
+
+
+    def start(self):
+        """
+        Starts polling on a background thread.
+
+        Parameters: none
+
+        Returns: none
+        """
+
+        self._stopped.clear()
+        self._thread = Thread(target=self.run, daemon=True)
+        self._thread.start()
+
+
+    def stop(self, wait=True):
+        """
+        Stops the background polling thread. Subscribers are not notified after this, even by a poll that is in flight.
+
+        Parameters:
+            wait (bool): wait for an in-flight poll to finish (up to `timeout` seconds); pass False from a GUI thread,
+                         which must not block while the poll hands its results to it
+
+        Returns: none
+        """
+
+        self._stopped.set()
+        if self._thread is not None:
+            if wait:
+                self._thread.join()
+            self._thread = None
+
+
+def liveMatchup(matchup, abbrevs):
+    """
+    Returns the LiveMatchup of one scoreboard schedule entry.
+
+    Parameters:
+        matchup (dict): the schedule entry
+        abbrevs (dict): dictionary with the team id as the key and the team abbrev as the value
+
+    Returns:
+        matchup (LiveMatchup): the matchup's teams and live scores
+    """
+
+    home = matchup['home']
+    away = matchup['away']
+
+    return LiveMatchup(
+        abbrevs.get(home['teamId'], str(home['teamId'])),
+        abbrevs.get(away['teamId'], str(away['teamId'])),
+        round(home.get('totalPointsLive', home.get('totalPoints', 0)), 2),
+        round(away.get('totalPointsLive', away.get('totalPoints', 0)), 2)
+    )
+
+
+def _entries(data, key):
+
+    entries = data.get(key)
+    return entries if isinstance(entries, list) else []
+
+
+class ReplayServer:
+    """
+    Local stand-in for the ESPN scoreboard endpoint that replays a recorded game day.
+    The recording is a file with one scoreboard payload per line, as written by LiveScorer's recordPath.
+    Each request is answered with the next payload, and the last payload is repeated once the
+    recording runs out. Payloads carry an ETag so unchanged polls are answered with 304.
+
+    Attributes:
+        payloads (list)
+            - the recorded payloads, in order
+        url (str)
+            - the base url to hand to LiveScorer
+
+    Methods:
+        start()
+        stop()
+    """
+
+    def __init__(self, recordPath, port=0):
+
+        with open(recordPath, 'rb') as f:
+            self.payloads = [line.rstrip(b'\n') for line in f if line.strip()]
+
+        if not self.payloads:
+            raise ValueError("no payloads recorded in " + recordPath)
+
+        self._next = 0
+        self._server = ThreadingHTTPServer(('127.0.0.1', port), self._handler())
+        self.url = "http://127.0.0.1:" + str(self._server.server_address[1]) + "/{year}/{league_id}"
+        self._thread = None
+
+
+    def _handler(self):
+
+        replay = self
+
+        class Handler(BaseHTTPRequestHandler):
+
+            def do_GET(self):
+                payload = replay.payloads[min(replay._next, len(replay.payloads) - 1)]
+                replay._next += 1
+
+                etag = '"' + hashlib.sha1(payload).hexdigest() + '"'
+                if self.headers.get('If-None-Match') == etag:
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.send_header('ETag', etag)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+    def start(self):
+        """
+        Starts serving on a background thread.
+        """
+
+        self._thread = Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+
+    def stop(self):
+        """
+        Stops the server.
+        """
+
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+def printMatchups(changed):
+    for matchup in changed:
+        print(matchup.home_abbrev, matchup.home_score, "-", matchup.away_score, matchup.away_abbrev)
+    print()
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Poll the current week's fantasy scores")
+    parser.add_argument("week", type=int, help="the week to poll")
+    parser.add_argument("--year", type=int, default=DEFAULT_SEASON)
+    parser.add_argument("--interval", type=float, default=30, help="seconds between polls")
+    parser.add_argument("--timeout", type=float, default=REQUEST_TIMEOUT, help="seconds to wait for each response")
+    parser.add_argument("--polls", type=int, default=None, help="stop after this many polls")
+    parser.add_argument("--record", help="append every changed payload to this file")
+    parser.add_argument("--replay", help="replay a recorded game day from this file instead of ESPN")
+    args = parser.parse_args()
+
+    setupFromEnv()
+
+    server = None
+    baseUrl = None
+    if args.replay:
+        server = ReplayServer(args.replay)
+        server.start()
+        baseUrl = server.url
+
+    scorer = LiveScorer(args.week, year=args.year, interval=args.interval, baseUrl=baseUrl,
+                         recordPath=args.record, timeout=args.timeout)
+    scorer.subscribe(printMatchups)
+
+    try:
+        scorer.run(polls=args.polls)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if server is not None:
+            server.stop()
@@ -1,12 +1,36 @@
 from tkinter import Tk, Label, Button, X
+from threading import Thread
+from config import setupFromEnv
 from fantasy import Fantasy
+from tracing import span
 
+setupFromEnv()
 
-fantasy = Fantasy()
+
+# the league is loaded on a background thread once the window is up
+fantasy = None
+liveScorer = None
+
+
+def loadFantasy():
+    global fantasy
+
+    try:
+        with span("Fantasy()"):
+            loaded = Fantasy()
+    except Exception as e:
+        root.after(0, lambda: statusLabel.config(text="Could not load the league: " + str(e)))
+        return
+
+    fantasy = loaded
+    root.after(0, lambda: statusLabel.config(text="League loaded (Week " + str(loaded.league.current_week) + ")"))
 
 
 def plot_graph(number):
 
+    if fantasy is None:
+        return
+
     if number == 1:
         fantasy.plotAvgPosRanks()
     elif number == 2:
@@ -30,6 +54,9 @@ def plot_graph(number):
 
 
 def scoresOverTime(choice):
+    if fantasy is None:
+        return
+
     if choice == 1:
         fantasy.plotAllScoresOverTime()
     # if choice is a string
@@ -48,11 +75,52 @@ def scoresOverTime(choice):
     fantasy.showPlots()
 
 
+def plotProjectedPoints():
+    if fantasy is None:
+        return
+
+    from projections import projectLeague, plotProjections
+
+    plotProjections(projectLeague(fantasy))
+    fantasy.showPlots()
+
+
+def showLiveScores():
+    lines = []
+    for team in sorted(fantasy.liveRanks, key=fantasy.liveRanks.get):
+        lines.append(str(fantasy.liveRanks[team]) + ". " + team + " " + str(fantasy.liveScores[team]))
+    liveLabel.config(text="\n".join(lines))
+
+
+def toggleLiveScoring():
+    global liveScorer
+
+    if fantasy is None:
+        return
+
+    if liveScorer is None:
+        from live import LiveScorer
+
+        liveScorer = LiveScorer(fantasy.league.current_week, year=fantasy.league.year)
+        liveScorer.subscribe(fantasy.updateLiveScores)
+        # subscribers run on the polling thread, so hand the redraw to the Tk event loop
+        liveScorer.subscribe(lambda changed: root.after(0, showLiveScores))
+        liveScorer.start()
+        liveButton.config(text="Stop Live Scoring")
+    else:
+        # don't join the polling thread here: an in-flight poll could be waiting on this thread
+        liveScorer.stop(wait=False)
+        liveScorer = None
+        liveButton.config(text="Start Live Scoring")
+
+
 root = Tk()
 
 
 root.title("Fantasy Football Data Analysis")
 Label(root, text="Fantasy Football Data Analysis", font=("Helvetica", 16)).pack(pady=10)
+statusLabel = Label(root, text="Loading league...")
+statusLabel.pack()
 
 Button(root, text="Plot Avg. Position Ranks of Starters", command=lambda: plot_graph(1)).pack(fill=X)
 Button(root, text="Plot Avg. Position Ranks of Entire Team", command=lambda: plot_graph(7)).pack(fill=X)
@@ -60,6 +128,7 @@ Button(root, text="Plot Std. Dev. of Position Ranks", command=lambda: plot_graph
 Button(root, text="Plot Avg. Scores", command=lambda: plot_graph(3)).pack(fill=X)
 Button(root, text="Plot Std. Dev. of Scores", command=lambda: plot_graph(4)).pack(fill=X)
 Button(root, text="Plot All", command=lambda: plot_graph(5)).pack(fill=X)
+Button(root, text="Plot Projected Points", command=plotProjectedPoints).pack(fill=X)
 Button(root, text="Debug", command=lambda: plot_graph(14)).pack(fill=X)
 Button(root, text="Quit", command=root.quit).pack(fill=X)
 
@@ -75,5 +144,13 @@ Button(root, text="", command=lambda: scoresOverTime('')).pack(fill=X)
 Button(root, text="Plot All Separately", command=lambda: scoresOverTime(None)).pack(fill=X)
 Button(root, text="Plot All Together", command=lambda: scoresOverTime(1)).pack(fill=X)
 
+Label(root, text="Live Scores", font=("Helvetica", 16)).pack(pady=10)
+liveButton = Button(root, text="Start Live Scoring", command=toggleLiveScoring)
+liveButton.pack(fill=X)
+liveLabel = Label(root, text="", justify="left")
+liveLabel.pack(fill=X)
+
+
+Thread(target=loadFantasy, daemon=True).start()
 
 root.mainloop()
\ No newline at end of file
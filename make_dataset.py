@@ -1,13 +1,19 @@
 import requests
 import pandas as pd
 import numpy as np
-from fantasy import Fantasy
+from config import setupFromEnv
+from fantasy import connectLeague
+from warehouse import Warehouse, WAREHOUSE_PATH
+from tracing import span
 from tqdm import tqdm
 
+setupFromEnv()
+
 url = "https://sports.core.api.espn.com/v3/sports/football/nfl/athletes?limit=18000"
 
 print("Retrieving raw data from ESPN...")
-jsonData = requests.get(url).json()
+with span("athletes request"):
+    jsonData = requests.get(url).json()
 
 print("Creating dataframe...")
 players = pd.DataFrame(jsonData['items'])
@@ -20,7 +26,8 @@ players = players[players['active'] == True]
 
 # write the dataframe to a csv file
 print("Writing dataframe to csv...")
-players.to_csv("players.csv")
+with span("write players.csv"):
+    players.to_csv("players.csv")
 
 print("Players shape:", players.shape)
 
@@ -28,9 +35,9 @@ print("Players shape:", players.shape)
 print("Removing unnecessary columns...")
 players = players[['lastName', 'firstName', 'fullName']]
 
-# Create instance of Fantasy class
-print("Creating instance of Fantasy class...")
-fantasy = Fantasy()
+# Connect to the league, only its player lookup is needed here so no box scores are loaded
+print("Connecting to league...")
+league = connectLeague()
 
 # Get all player objects
 player_objects = []
@@ -38,7 +45,8 @@ print("Gathering player objects...")
 for i in tqdm(range(players.shape[0]), desc="Processing players"):
     # get player's full name
     try:
-        player = fantasy.league.player_info(players.iloc[i]['fullName'])
+        with span("League.player_info"):
+            player = league.player_info(players.iloc[i]['fullName'])
     except:
         player = None
 
@@ -49,6 +57,18 @@ for i in tqdm(range(players.shape[0]), desc="Processing players"):
     # add player's stats to list
     player_objects.append(player)
 
+# Store every player's weekly stats in the warehouse
+if WAREHOUSE_PATH:
+    print("Writing player stats to warehouse...")
+    with span("write warehouse"):
+        with Warehouse() as warehouse:
+            # the same stats that go into player_stats.csv below
+            warehouse.savePlayerStats(
+                player_objects,
+                league.year,
+                include=lambda stat: not (stat.isdigit() or stat.startswith('defensive'))
+            )
+
 # Initilize dataframe
 player_stats_df = pd.DataFrame(columns=['fullName', 'position', 'points'])
 
@@ -80,7 +100,8 @@ for object in tqdm(player_objects, desc="Creating dataframe of player stats"):
     player_row['points'] = object.stats[week]['points']
 
     # add row to dataframe
-    player_stats_df = player_stats_df._append(player_row, ignore_index=True)
+    with span("append player row"):
+        player_stats_df = player_stats_df._append(player_row, ignore_index=True)
 
 
 # check if any duplicate columns exist
@@ -103,7 +124,8 @@ stats_df = player_stats_df.iloc[:, 3:]
 
 # sort columns
 print("Sorting columns...")
-stats_df = stats_df.reindex(sorted(stats_df.columns, key=lambda x: int(x.split('_')[0])), axis=1)
+with span("sort columns"):
+    stats_df = stats_df.reindex(sorted(stats_df.columns, key=lambda x: int(x.split('_')[0])), axis=1)
 
 # Combine meta_df and stats_df
 player_stats_df = pd.concat([meta_df, stats_df], axis=1)
@@ -117,7 +139,8 @@ print("Shape of dataframe:", player_stats_df.shape)
 
 # write the dataframe to a csv file
 print("Writing dataframe to csv...")
-player_stats_df.to_csv("player_stats.csv")
+with span("write player_stats.csv"):
+    player_stats_df.to_csv("player_stats.csv")
 
 # # Split the dataset by position
 # print("Splitting dataset by position...")
@@ -0,0 +1,328 @@
+import hashlib
+import json
+import os
+import re
+
+from fantasy import pyplot
+from snapshot import STARTING_EXCLUDED
+from tracing import span, traced
+
+# written by deep_net.py after training
+MODEL_PATH = "player_model.keras"
+SCALER_PATH = "player_scaler.pkl"
+
+# deep_net.py trains the model to predict the week 14 points from the weeks before it, so a player's
+# recent weeks are shifted to end at week 13 to project any other week
+TARGET_WEEK = 14
+
+CACHE_DIR = "projections_cache"
+
+# deep_net.py trains without quarterbacks and kickers, and team defenses are not players in the
+# dataset, so these starters are never projected and only show up as unresolved
+UNPROJECTED_POSITIONS = ('QB', 'K', 'D/ST')
+
+# name suffixes ESPN writes inconsistently between the fantasy rosters and the athletes list
+NAME_SUFFIXES = re.compile(r"\s+(jr|sr|ii|iii|iv|v)$")
+
+
+def normalizeName(name):
+    """
+    Returns a player's name in the form used to match fantasy rosters against the model dataset:
+    lower case, without punctuation or a generational suffix.
+    """
+
+    name = re.sub(r"[.'\-]", "", name.lower()).strip()
+    return NAME_SUFFIXES.sub("", name)
+
+
+class Projector:
+    """
+    Class that projects a week's points with the network trained by deep_net.py.
+
+    Each player's input is built from their weekly stats in the warehouse (written by make_dataset.py)
+    for the weeks before the one projected, lined up with the model's feature window: the week before
+    the projected one becomes week 13, the one before it week 12 and so on, the season totals so far
+    stand in for the week 0 totals and the weeks after TARGET_WEEK, which are not known yet, are left at 0.
+
+    The model and scaler are only loaded the first time players are projected, and all of the players
+    asked for are scored together in a single batch.
+
+    Attributes:
+        modelPath (str)
+            - the saved Keras model
+        scalerPath (str)
+            - the pickled scaler, feature columns and position classes
+        warehousePath (str)
+            - the warehouse holding the players' weekly stats (optional, defaults to WAREHOUSE_PATH)
+
+    Methods:
+        load()
+        weekFeatures()
+        projectPlayers()
+    """
+
+    def __init__(self, modelPath=MODEL_PATH, scalerPath=SCALER_PATH, warehousePath=None):
+
+        self.modelPath = modelPath
+        self.scalerPath = scalerPath
+        self.warehousePath = warehousePath
+
+        self.model = None
+        self.scaler = None
+        self.columns = None
+        self.positions = None
+
+
+    @traced()
+    def load(self):
+        """
+        Loads the model, the scaler, the feature columns and the encoding of the positions the model was trained on.
+
+        Parameters: none
+
+        Returns: none
+        """
+
+        import pickle
+        from keras.models import load_model
+
+        with open(self.scalerPath, "rb") as f:
+            saved = pickle.load(f)
+
+        if 'positions' not in saved:
+            raise ValueError(self.scalerPath + " has no position classes, retrain the model with deep_net.py")
+
+        self.model = load_model(self.modelPath)
+        self.scaler = saved['scaler']
+        self.columns = saved['columns']
+        # deep_net.py label encodes the positions, i.e. by their index in the sorted classes
+        self.positions = {position: code for code, position in enumerate(saved['positions'])}
+
+
+    @traced()
+    def weekFeatures(self, season, week):
+        """
+        Returns the model input of every player with stats before the given week, lined up with the model's feature window.
+        Players at positions the model was not trained on are left out.
+
+        Parameters:
+            season (int): the season
+            week (int): the week to project
+
+        Returns:
+            features (ndarray): one row of model features per player
+            rows (dict): dictionary with the normalized player name as the key and the row as the value
+        """
+
+        import pandas as pd
+        from warehouse import Warehouse, Between
+
+        if self.model is None:
+            self.load()
+
+        with Warehouse(self.warehousePath) as warehouse:
+            stats = warehouse.playerStats(season, weeks=Between(1, week - 1))
+
+        stats = stats[stats['position'].isin(self.positions)].reset_index(drop=True)
+        weekly = stats.drop(columns=['fullName', 'position', 'points'])
+
+        shift = TARGET_WEEK - week
+        aligned = {}
+        totals = {}
+
+        for column in weekly.columns:
+            statWeek, stat = column.split('_', 1)
+            values = weekly[column].fillna(0)
+            totals[stat] = totals[stat] + values if stat in totals else values
+
+            alignedWeek = int(statWeek) + shift
+            if 1 <= alignedWeek < TARGET_WEEK:
+                aligned[str(alignedWeek) + '_' + stat] = values
+
+        for stat, values in totals.items():
+            aligned['0_' + stat] = values
+
+        features = pd.DataFrame(aligned, index=stats.index)
+        features['points'] = stats['points']
+        features['position'] = stats['position'].map(self.positions)
+
+        # the first row wins when two players share a name
+        rows = {}
+        for row, name in enumerate(stats['fullName']):
+            rows.setdefault(normalizeName(name), row)
+
+        return features.reindex(columns=self.columns).fillna(0).to_numpy(dtype='float32'), rows
+
+
+    @traced()
+    def projectPlayers(self, names, season, week):
+        """
+        Returns the projected points of each player in the given week, scoring every player that has stats
+        before that week in one batch.
+
+        Parameters:
+            names (iterable): the player names
+            season (int): the season
+            week (int): the week to project
+
+        Returns:
+            points (dict): dictionary with the player name as the key and the projected points as the value,
+                           or None if the player has no stats before the week or plays a position the model does not cover
+        """
+
+        features, playerRows = self.weekFeatures(season, week)
+
+        points = {}
+        resolved = []
+        rows = []
+
+        for name in names:
+            row = playerRows.get(normalizeName(name))
+            if row is None:
+                points[name] = None
+            else:
+                resolved.append(name)
+                rows.append(row)
+
+        if rows:
+            with span("model.predict", players=len(rows)):
+                predictions = self.model.predict(self.scaler.transform(features[rows]), batch_size=len(rows), verbose=0)
+
+            for name, prediction in zip(resolved, predictions[:, 0]):
+                points[name] = float(prediction)
+
+        return points
+
+
+def cachePath(leagueId, year, week, cacheDir=CACHE_DIR):
+    return os.path.join(cacheDir, str(leagueId) + "_" + str(year) + "_week" + str(week) + ".json")
+
+
+def lineupsDigest(wholeLineups):
+    """
+    Returns a digest of every team's players and slots, so a cached projection is redone after a lineup change.
+    """
+
+    digest = hashlib.sha1()
+    for team in sorted(wholeLineups):
+        digest.update(team.encode())
+        for player in sorted((player.name, player.slot_position) for player in wholeLineups[team]):
+            digest.update(("|" + player[0] + ":" + player[1]).encode())
+    return digest.hexdigest()
+
+
+@traced()
+def projectLeague(fantasy, projector=None, cacheDir=CACHE_DIR):
+    """
+    Projects the current week for every team in the league: the total of the starters the model can project
+    and the value left on the bench. The model does not cover quarterbacks, kickers or team defenses
+    (UNPROJECTED_POSITIONS), so those starters are not in the total; they are counted as unprojected and
+    listed as unresolved. The players are projected from their stats in the weeks before the current one,
+    so make_dataset.py has to have stored this season's stats. Results are cached per league and week,
+    and reused until the lineups change or the model is retrained.
+
+    Parameters:
+        fantasy (Fantasy): the league
+        projector (Projector): the projector to use (optional, defaults to one using deep_net.py's saved model)
+        cacheDir (str): the cache directory
+
+    Returns:
+        projections (dict): the week, the projected points of each player and, for each team abbrev,
+                            the total of the projected starters, the number of starters that could not be
+                            projected, the bench value and the players that could not be projected
+    """
+
+    projector = projector or Projector()
+    week = fantasy.league.current_week
+    year = fantasy.league.year
+    modelStamp = os.path.getmtime(projector.modelPath) if os.path.exists(projector.modelPath) else None
+    lineups = lineupsDigest(fantasy.wholeLineups)
+
+    path = cachePath(fantasy.league.league_id, year, week, cacheDir)
+    if os.path.exists(path):
+        with open(path) as f:
+            cached = json.load(f)
+        if cached['model'] == modelStamp and cached.get('lineups') == lineups:
+            return cached
+
+    names = {player.name for lineup in fantasy.wholeLineups.values() for player in lineup}
+    players = projector.projectPlayers(names, year, week)
+
+    teams = {}
+    for team, lineup in fantasy.wholeLineups.items():
+        starters = 0.0
+        unprojectedStarters = 0
+        bench = 0.0
+        unresolved = []
+
+        for player in lineup:
+            projected = players[player.name]
+            if projected is None:
+                unresolved.append(player.name)
+                if player.slot_position not in STARTING_EXCLUDED:
+                    unprojectedStarters += 1
+            elif player.slot_position == 'BE':
+                bench += projected
+            elif player.slot_position not in STARTING_EXCLUDED:
+                starters += projected
+
+        teams[team] = {'starters': starters, 'unprojectedStarters': unprojectedStarters, 'bench': bench, 'unresolved': unresolved}
+
+    projections = {'year': year, 'week': week, 'model': modelStamp, 'lineups': lineups, 'players': players, 'teams': teams}
+
+    os.makedirs(cacheDir, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(projections, f)
+
+    return projections
+
+
+def plotProjections(projections):
+    """
+    Creates and plots a scatter plot of each team's total of projected starters and bench value.
+    Starters the model does not cover are left out of the total; their number is shown next to each point.
+
+    Parameters:
+        projections (dict): the output of projectLeague()
+
+    Returns: none
+    """
+
+    plt = pyplot()
+
+    teams = projections['teams']
+    starters = {team: teams[team]['starters'] for team in teams}
+    bench = {team: teams[team]['bench'] for team in teams}
+
+    plt.figure()
+    plt.scatter(starters.keys(), starters.values(), label="Projected starters (no " + ", ".join(UNPROJECTED_POSITIONS) + ")")
+    plt.scatter(bench.keys(), bench.values(), label="Bench")
+    plt.title("Projected Points of Each Team (Week " + str(projections['week']) + ")")
+    plt.xlabel("Team")
+    plt.ylabel("Projected Points")
+    plt.legend()
+
+    # Label the points with the values (truncate to 1 decimal place)
+    for team in starters:
+        plt.annotate(str(round(starters[team], 1)) + " (" + str(teams[team]['unprojectedStarters']) + " not projected)",
+                     (team, starters[team]))
+        plt.annotate(str(round(bench[team], 1)), (team, bench[team]))
+
+
+if __name__ == "__main__":
+
+    from config import setupFromEnv
+    from fantasy import Fantasy
+
+    setupFromEnv()
+
+    fantasy = Fantasy()
+    projections = projectLeague(fantasy)
+
+    for team, projection in projections['teams'].items():
+        print(team, round(projection['starters'], 1), "from projected starters,",
+              projection['unprojectedStarters'], "starters not projected,",
+              round(projection['bench'], 1), "bench,", len(projection['unresolved']), "players not projected")
+
+    plotProjections(projections)
+    fantasy.showPlots()
@@ -0,0 +1,178 @@
+from collections import deque
+from math import sqrt
+
+
+class RunningStats:
+    """
+    Class that keeps a streaming mean and standard deviation of a series of values.
+    Values are folded in one at a time (Welford's method), so adding a value costs O(1)
+    no matter how many values came before it. The standard deviation is the population
+    standard deviation, the same value numpy.std returns for the full list.
+
+    Attributes:
+        count (int)
+            - the number of values added so far
+        mean (float)
+            - the mean of the values added so far
+        std (float)
+            - the standard deviation of the values added so far
+
+    Methods:
+        add()
+        extend()
+    """
+
+    __slots__ = ('count', '_mean', '_m2')
+
+    def __init__(self, values=()):
+
+        self.count = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+
+        self.extend(values)
+
+
+    def add(self, value):
+        """
+        Adds a single value to the running statistics.
+
+        Parameters:
+            value (float): the value to add
+
+        Returns: none
+        """
+
+        self.count += 1
+        delta = value - self._mean
+        self._mean += delta / self.count
+        self._m2 += delta * (value - self._mean)
+
+
+    def extend(self, values):
+        """
+        Adds every value in values to the running statistics.
+
+        Parameters:
+            values (iterable): the values to add
+
+        Returns: none
+        """
+
+        for value in values:
+            self.add(value)
+
+
+    @property
+    def mean(self):
+        if self.count == 0:
+            return float('nan')
+        return self._mean
+
+
+    @property
+    def variance(self):
+        if self.count == 0:
+            return float('nan')
+        return self._m2 / self.count
+
+
+    @property
+    def std(self):
+        return sqrt(self.variance)
+
+
+class RollingStats:
+    """
+    Class that keeps the mean and standard deviation of the last `window` values of a series.
+    Adding a value pushes it into the window and drops the oldest one, updating a running
+    sum and sum of squares so the cost stays O(1) per value.
+
+    Attributes:
+        window (int)
+            - the number of most recent values the statistics cover
+        values (deque)
+            - the values currently inside the window
+        mean (float)
+            - the mean of the values inside the window
+        std (float)
+            - the standard deviation of the values inside the window
+
+    Methods:
+        add()
+        extend()
+    """
+
+    __slots__ = ('window', 'values', '_sum', '_sumSquares')
+
+    def __init__(self, window, values=()):
+
+        if window < 1:
+            raise ValueError("window must be at least 1")
+
+        self.window = window
+        self.values = deque()
+        self._sum = 0.0
+        self._sumSquares = 0.0
+
+        self.extend(values)
+
+
+    def add(self, value):
+        """
+        Adds a single value to the window, dropping the oldest value if the window is full.
+
+        Parameters:
+            value (float): the value to add
+
+        Returns: none
+        """
+
+        if len(self.values) == self.window:
+            oldest = self.values.popleft()
+            self._sum -= oldest
+            self._sumSquares -= oldest * oldest
+
+        self.values.append(value)
+        self._sum += value
+        self._sumSquares += value * value
+
+
+    def extend(self, values):
+        """
+        Adds every value in values to the window.
+
+        Parameters:
+            values (iterable): the values to add
+
+        Returns: none
+        """
+
+        for value in values:
+            self.add(value)
+
+
+    @property
+    def count(self):
+        return len(self.values)
+
+
+    @property
+    def mean(self):
+        if not self.values:
+            return float('nan')
+        return self._sum / len(self.values)
+
+
+    @property
+    def variance(self):
+        if not self.values:
+            return float('nan')
+        mean = self._sum / len(self.values)
+        # guard against tiny negative values from floating point cancellation
+        return max(self._sumSquares / len(self.values) - mean * mean, 0.0)
+
+
+    @property
+    def std(self):
+        return sqrt(self.variance)
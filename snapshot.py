@@ -0,0 +1,220 @@
+from datetime import date
+from sys import intern
+
+# The analytics only read a handful of fields from the espn_api objects, so Fantasy copies those
+# fields into the slotted records below and lets the raw BoxScore, Team and Player objects go.
+# The records keep the espn_api attribute names, so code written against the raw objects keeps working.
+# Names, abbreviations and positions are interned, so every record of the same player or team shares
+# one string.
+
+STARTING_EXCLUDED = ('BE', 'IR')
+
+
+def seasonCompleted(year, today=None):
+    """
+    Returns whether the fantasy season of the given year is over, i.e. its data can no longer change.
+    Fantasy playoffs end by early January, so a season counts as completed from February of the next year.
+
+    Parameters:
+        year (int): the season
+        today (date): the date to check against (optional, defaults to today)
+
+    Returns:
+        completed (bool): whether the season is over
+    """
+
+    today = today or date.today()
+    return today >= date(year + 1, 2, 1)
+
+
+class PlayerRecord:
+    """
+    Compact copy of an espn_api Player / BoxPlayer.
+    """
+
+    __slots__ = ('name', 'position', 'slot_position', 'posRank', 'points', 'team_abbrev')
+
+    def __init__(self, name, position, slot_position, posRank, points, team_abbrev):
+
+        self.name = name
+        self.position = position
+        self.slot_position = slot_position
+        self.posRank = posRank
+        self.points = points
+        self.team_abbrev = team_abbrev
+
+
+    def __repr__(self):
+        return "PlayerRecord(" + self.name + ")"
+
+
+class TeamRecord:
+    """
+    Compact copy of an espn_api Team. The roster is a tuple of PlayerRecords.
+    """
+
+    __slots__ = ('team_id', 'team_abbrev', 'team_name', 'roster')
+
+    def __init__(self, team_id, team_abbrev, team_name, roster):
+
+        self.team_id = team_id
+        self.team_abbrev = team_abbrev
+        self.team_name = team_name
+        self.roster = roster
+
+
+    def __repr__(self):
+        return "TeamRecord(" + self.team_abbrev + ")"
+
+
+class BoxScoreRecord:
+    """
+    Compact copy of an espn_api BoxScore. The teams are TeamRecords and the lineups are tuples of PlayerRecords.
+    In a playoff bye the away team is None and its lineup is empty.
+    """
+
+    __slots__ = ('home_team', 'away_team', 'home_score', 'away_score', 'home_lineup', 'away_lineup')
+
+    def __init__(self, home_team, away_team, home_score, away_score, home_lineup, away_lineup):
+
+        self.home_team = home_team
+        self.away_team = away_team
+        self.home_score = home_score
+        self.away_score = away_score
+        self.home_lineup = home_lineup
+        self.away_lineup = away_lineup
+
+
+    def __repr__(self):
+        away = "bye" if self.away_team is None else self.away_team.team_abbrev
+        return "BoxScoreRecord(" + self.home_team.team_abbrev + " vs " + away + ")"
+
+
+class LeagueRecord:
+    """
+    Compact copy of the espn_api League fields that are read once the league is loaded.
+    """
+
+    __slots__ = ('league_id', 'year', 'current_week')
+
+    def __init__(self, league_id, year, current_week):
+
+        self.league_id = league_id
+        self.year = year
+        self.current_week = current_week
+
+
+    def __repr__(self):
+        return "LeagueRecord(" + str(self.league_id) + ", " + str(self.year) + ")"
+
+
+def snapshotLeague(league):
+    """
+    Returns a LeagueRecord copied from an espn_api League, so the League and the Teams, Players and
+    schedule it links to can be released.
+
+    Parameters:
+        league (League): the league
+
+    Returns:
+        record (LeagueRecord): the compact copy
+    """
+
+    return LeagueRecord(getattr(league, 'league_id', None), league.year, league.current_week)
+
+
+def snapshotPlayer(player, teamAbbrev):
+    """
+    Returns a PlayerRecord copied from an espn_api Player or BoxPlayer.
+
+    Parameters:
+        player (Player): the player
+        teamAbbrev (str): the abbrev of the fantasy team the player belongs to
+
+    Returns:
+        record (PlayerRecord): the compact copy
+    """
+
+    return PlayerRecord(
+        intern(player.name),
+        intern(getattr(player, 'position', '')),
+        intern(getattr(player, 'slot_position', '')),
+        getattr(player, 'posRank', 0),
+        getattr(player, 'points', 0.0),
+        teamAbbrev
+    )
+
+
+def snapshotTeams(teams):
+    """
+    Returns TeamRecords copied from espn_api Teams, including their rosters.
+
+    Parameters:
+        teams (list): the teams of the league
+
+    Returns:
+        records (list): the TeamRecords, in the same order
+    """
+
+    records = []
+
+    for team in teams:
+        abbrev = intern(team.team_abbrev)
+        roster = tuple(snapshotPlayer(player, abbrev) for player in team.roster)
+        records.append(TeamRecord(team.team_id, abbrev, getattr(team, 'team_name', abbrev), roster))
+
+    return records
+
+
+def snapshotBoxScores(boxscores, teams):
+    """
+    Returns BoxScoreRecords copied from one week of espn_api BoxScores. Records are passed through unchanged.
+
+    Parameters:
+        boxscores (list): the boxscores of a week
+        teams (dict): dictionary with the team abbrev as the key and the TeamRecord as the value;
+                      teams missing from it are added with an empty roster
+
+    Returns:
+        records (list): the BoxScoreRecords, in the same order, with None for the missing team of a bye
+    """
+
+    records = []
+
+    for boxscore in boxscores:
+        if isinstance(boxscore, BoxScoreRecord):
+            records.append(boxscore)
+            continue
+
+        home = _teamRecord(boxscore.home_team, teams)
+        away = _teamRecord(boxscore.away_team, teams)
+
+        records.append(BoxScoreRecord(
+            home,
+            away,
+            boxscore.home_score,
+            boxscore.away_score,
+            _lineupRecords(boxscore.home_lineup, home),
+            _lineupRecords(boxscore.away_lineup, away)
+        ))
+
+    return records
+
+
+def _teamRecord(team, teams):
+
+    if team is None:
+        return None
+
+    record = teams.get(team.team_abbrev)
+    if record is None:
+        abbrev = intern(team.team_abbrev)
+        record = teams[abbrev] = TeamRecord(getattr(team, 'team_id', None), abbrev, getattr(team, 'team_name', abbrev), ())
+    return record
+
+
+def _lineupRecords(lineup, team):
+
+    if team is None:
+        return ()
+    return tuple(snapshotPlayer(player, team.team_abbrev) for player in lineup)
@@ -0,0 +1,95 @@
+import argparse
+import os
+import subprocess
+import sys
+
+# the project modules that are imported by the tools; the scripts themselves (main.py, make_dataset.py,
+# deep_net.py) run when imported, so their startup is covered through the modules they import
+MODULES = ['config', 'fantasy', 'live', 'transport', 'tracing', 'batch', 'snapshot', 'running_stats', 'synthetic', 'projections', 'warehouse']
+
+
+def importTimes(module):
+    """
+    Imports a module in a fresh interpreter with -X importtime and returns the timings it reports.
+
+    Parameters:
+        module (str): the module to import
+
+    Returns:
+        timings (list): (name, self time in ms, cumulative time in ms, depth) for every module imported, in import order
+    """
+
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import ' + module],
+        capture_output=True,
+        text=True,
+        cwd=os.path.dirname(os.path.abspath(__file__))
+    )
+
+    if result.returncode != 0:
+        raise ImportError("could not import " + module + ":\n" + result.stderr.strip().splitlines()[-1])
+
+    timings = []
+
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+
+        selfTime, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        timings.append((name.strip(), int(selfTime) / 1000, int(cumulative) / 1000, depth))
+
+    return timings
+
+
+def startupReport(module, top=10):
+    """
+    Prints how long a module takes to import and which of the modules it pulls in cost the most.
+
+    Parameters:
+        module (str): the module to import
+        top (int): the number of slowest imports to list
+
+    Returns:
+        total (float): the cumulative import time of the module in ms
+    """
+
+    timings = importTimes(module)
+
+    # a module's own line comes after the lines of everything it imported, which are indented deeper;
+    # walking back from it stops at the imports the interpreter made at startup
+    end = max(i for i, timing in enumerate(timings) if timing[0] == module and timing[3] == 0)
+    start = end
+    while start > 0 and timings[start - 1][3] > 0:
+        start -= 1
+
+    total = timings[end][2]
+    print(module + ": " + "{:.1f}".format(total) + " ms")
+
+    # the packages imported directly by the module and by its direct imports are the ones worth deferring
+    subtree = timings[start:end]
+    heaviest = sorted((timing for timing in subtree if timing[3] <= 2), key=lambda timing: timing[2], reverse=True)
+    for name, _, cumulative, depth in heaviest[:top]:
+        print("    " + "  " * (depth - 1) + "{:<40}{:>10.1f} ms".format(name, cumulative))
+    print()
+
+    return total
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Report how long the project's modules take to import")
+    parser.add_argument("modules", nargs="*", default=MODULES, help="the modules to import")
+    parser.add_argument("--top", type=int, default=10, help="the number of slowest imports to list per module")
+    parser.add_argument("--budget", type=float, help="exit with an error if any module takes longer than this many ms")
+    args = parser.parse_args()
+
+    slow = []
+    for module in args.modules:
+        total = startupReport(module, args.top)
+        if args.budget is not None and total > args.budget:
+            slow.append(module)
+
+    if slow:
+        print("Over the " + str(args.budget) + " ms budget: " + ", ".join(slow))
+        sys.exit(1)
@@ -0,0 +1,166 @@
+import random
+
+# starting lineup slots of a standard ESPN league, filled in this order
+STARTING_SLOTS = ['QB', 'RB', 'RB', 'WR', 'WR', 'TE', 'RB/WR/TE', 'D/ST', 'K']
+POSITIONS = ['QB', 'RB', 'WR', 'TE', 'D/ST', 'K']
+
+# roughly how many players of each position are ranked in a season
+POSITION_POOL = {'QB': 40, 'RB': 90, 'WR': 120, 'TE': 50, 'D/ST': 32, 'K': 32}
+
+
+class SyntheticPlayer:
+    """
+    Stand-in for an espn_api roster Player / BoxPlayer with the fields Fantasy reads.
+    """
+
+    def __init__(self, name, position, posRank, slot_position='BE', points=0.0):
+
+        self.name = name
+        self.position = position
+        self.posRank = posRank
+        self.slot_position = slot_position
+        self.points = points
+
+
+class SyntheticTeam:
+    """
+    Stand-in for an espn_api Team with the fields Fantasy reads.
+    """
+
+    def __init__(self, team_id, team_abbrev, roster):
+
+        self.team_id = team_id
+        self.team_abbrev = team_abbrev
+        self.team_name = "Team " + team_abbrev
+        self.roster = roster
+
+
+class SyntheticBoxScore:
+    """
+    Stand-in for an espn_api BoxScore with the fields Fantasy reads.
+    """
+
+    def __init__(self, home_team, away_team, home_lineup, away_lineup):
+
+        self.home_team = home_team
+        self.away_team = away_team
+        self.home_lineup = home_lineup
+        self.away_lineup = away_lineup
+        self.home_score = round(sum(player.points for player in home_lineup if player.slot_position not in ('BE', 'IR')), 2)
+        self.away_score = round(sum(player.points for player in away_lineup if player.slot_position not in ('BE', 'IR')), 2)
+
+
+class SyntheticLeague:
+    """
+    Class that generates a random league with the same structure as an espn_api League, so Fantasy
+    can be built and measured at any size without network access. The same seed always produces
+    the same league.
+
+    Attributes:
+        year (int)
+            - the season of the league
+        current_week (int)
+            - the current week, the last week that has box scores
+        teams (list)
+            - the SyntheticTeams of the league
+
+    Methods:
+        box_scores()
+    """
+
+    def __init__(self, numTeams=10, rosterSize=16, weeks=14, year=2025, seed=0):
+
+        if numTeams < 2 or numTeams % 2:
+            raise ValueError("numTeams must be an even number of at least 2")
+        if rosterSize < len(STARTING_SLOTS):
+            raise ValueError("rosterSize must be at least " + str(len(STARTING_SLOTS)))
+
+        self.year = year
+        self.current_week = weeks
+
+        self._random = random.Random(str(seed) + ":" + str(year))
+        self.teams = [self._makeTeam(i, rosterSize) for i in range(numTeams)]
+        self._box_scores = [self._makeWeek(week) for week in range(1, weeks + 1)]
+
+
+    def _makeTeam(self, index, rosterSize):
+
+        roster = []
+
+        # fill the starting slots first so every team can field a full lineup
+        positions = [slot if slot in POSITIONS else 'RB' for slot in STARTING_SLOTS]
+        while len(positions) < rosterSize:
+            positions.append(self._random.choice(POSITIONS))
+
+        for i, position in enumerate(positions):
+            name = "Player " + str(index + 1) + "-" + str(i + 1)
+            posRank = self._random.randint(1, POSITION_POOL[position])
+            roster.append(SyntheticPlayer(name, position, posRank))
+
+        return SyntheticTeam(index + 1, "T" + str(index + 1).zfill(3), roster)
+
+
+    def _makeLineup(self, team):
+
+        lineup = []
+        openSlots = list(STARTING_SLOTS)
+
+        for player in team.roster:
+            slot = 'BE'
+            for candidate in openSlots:
+                if candidate == player.position or (candidate == 'RB/WR/TE' and player.position in ('RB', 'WR', 'TE')):
+                    slot = candidate
+                    openSlots.remove(candidate)
+                    break
+
+            # better ranked players score more on average
+            points = max(round(self._random.gauss(22 - player.posRank / 6, 6), 2), 0.0)
+            lineup.append(SyntheticPlayer(player.name, player.position, player.posRank, slot, points))
+
+        return lineup
+
+
+    def _makeWeek(self, week):
+
+        teams = list(self.teams)
+        self._random.shuffle(teams)
+
+        boxscores = []
+        for i in range(0, len(teams), 2):
+            home, away = teams[i], teams[i + 1]
+            boxscores.append(SyntheticBoxScore(home, away, self._makeLineup(home), self._makeLineup(away)))
+
+        return boxscores
+
+
+    def box_scores(self, week):
+        """
+        Returns the box scores of the given week.
+
+        Parameters:
+            week (int): the week, starting at 1
+
+        Returns:
+            boxscores (list): the SyntheticBoxScores of the week
+        """
+
+        return self._box_scores[week - 1]
+
+
+def makeLeagues(numTeams=10, rosterSize=16, weeks=14, seasons=1, year=2025, seed=0):
+    """
+    Returns one SyntheticLeague per season, ending with the given year.
+
+    Parameters:
+        numTeams (int): the number of teams
+        rosterSize (int): the number of players on each roster
+        weeks (int): the number of weeks with box scores
+        seasons (int): the number of seasons
+        year (int): the most recent season
+        seed (int): the random seed
+
+    Returns:
+        leagues (list): the SyntheticLeagues, oldest season first
+    """
+
+    return [SyntheticLeague(numTeams, rosterSize, weeks, year - i, seed) for i in reversed(range(seasons))]
@@ -0,0 +1,179 @@
+import json
+import socket
+
+import pytest
+import requests
+
+from live import LiveScorer, LiveMatchup, ReplayServer
+
+WEEK = 3
+
+
+def scoreboard(*scores):
+    """
+    Returns a scoreboard payload with one matchup per (home score, away score) pair.
+    """
+
+    teams = []
+    schedule = []
+
+    for i, (homeScore, awayScore) in enumerate(scores):
+        homeId, awayId = 2 * i + 1, 2 * i + 2
+        teams += [{'id': homeId, 'abbrev': "H" + str(i)}, {'id': awayId, 'abbrev': "A" + str(i)}]
+        schedule.append({
+            'matchupPeriodId': WEEK,
+            'home': {'teamId': homeId, 'totalPointsLive': homeScore},
+            'away': {'teamId': awayId, 'totalPointsLive': awayScore}
+        })
+
+    return {'teams': teams, 'schedule': schedule}
+
+
+def writeRecording(path, payloads):
+
+    with open(path, 'w') as f:
+        for payload in payloads:
+            f.write((payload if isinstance(payload, str) else json.dumps(payload)) + "\n")
+    return str(path)
+
+
+class StatusSession(requests.Session):
+    """
+    Session that remembers the status code of every response.
+    """
+
+    def __init__(self):
+
+        super().__init__()
+        self.statuses = []
+
+    def request(self, *args, **kwargs):
+
+        response = super().request(*args, **kwargs)
+        self.statuses.append(response.status_code)
+        return response
+
+
+@pytest.fixture
+def replay(tmp_path):
+
+    servers = []
+
+    def serve(payloads):
+        server = ReplayServer(writeRecording(tmp_path / "gameday.jsonl", payloads))
+        server.start()
+        servers.append(server)
+        return server
+
+    yield serve
+
+    for server in servers:
+        server.stop()
+
+
+def scorerFor(server, **kwargs):
+
+    scorer = LiveScorer(WEEK, year=2024, leagueId=1, interval=0, baseUrl=server.url, **kwargs)
+    delivered = []
+    scorer.subscribe(delivered.append)
+    return scorer, delivered
+
+
+def test_only_changed_matchups_are_delivered(replay):
+
+    server = replay([scoreboard((0, 0), (0, 0)), scoreboard((6.5, 0), (0, 0)), scoreboard((6.5, 3), (0, 2.04))])
+    scorer, delivered = scorerFor(server)
+
+    scorer.run(polls=3)
+
+    assert delivered == [
+        [LiveMatchup('H0', 'A0', 0, 0), LiveMatchup('H1', 'A1', 0, 0)],
+        [LiveMatchup('H0', 'A0', 6.5, 0)],
+        [LiveMatchup('H0', 'A0', 6.5, 3), LiveMatchup('H1', 'A1', 0, 2.04)]
+    ]
+
+
+def test_unchanged_payloads_deliver_nothing(replay):
+
+    server = replay([scoreboard((1, 2))])
+    session = StatusSession()
+    scorer, delivered = scorerFor(server, session=session)
+
+    assert len(scorer.poll()) == 1
+
+    # the replayed payload repeats with the same ETag
+    assert scorer.poll() == []
+    assert session.statuses == [200, 304]
+
+    # without the ETag the server sends the identical body again, which is dropped by its digest
+    scorer._etag = None
+    assert scorer.poll() == []
+    assert session.statuses == [200, 304, 200]
+
+    assert len(delivered) == 1
+
+
+def test_malformed_polls_do_not_stop_polling(replay):
+
+    malformed = scoreboard((1, 1), (2, 2))
+    del malformed['schedule'][0]['home']
+    malformed['schedule'][1]['away']['totalPointsLive'] = "n/a"
+
+    server = replay(["not json", [1, 2], malformed, scoreboard((4, 5))])
+    scorer, delivered = scorerFor(server)
+    scorer.subscribe(lambda changed: 1 / 0)
+
+    scorer.run(polls=4)
+
+    assert delivered == [[LiveMatchup('H0', 'A0', 4, 5)]]
+    assert scorer.lastError is None
+
+
+def test_failed_requests_do_not_stop_polling():
+
+    # a port nothing listens on
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        port = s.getsockname()[1]
+
+    scorer = LiveScorer(WEEK, interval=0, timeout=1, baseUrl="http://127.0.0.1:" + str(port) + "/{year}/{league_id}")
+    polled = []
+    scorer.poll = lambda poll=scorer.poll: polled.append(1) or poll()
+
+    scorer.run(polls=3)
+
+    assert len(polled) == 3
+    assert isinstance(scorer.lastError, requests.ConnectionError)
+
+
+def test_recorded_game_day_replays_the_same_deltas(replay, tmp_path):
+
+    live = replay([scoreboard((0, 0)), scoreboard((0, 0)), scoreboard((3, 1)), scoreboard((10, 1))])
+    recordPath = str(tmp_path / "recorded.jsonl")
+    scorer, delivered = scorerFor(live, recordPath=recordPath)
+    scorer.run(polls=4)
+
+    # only the payloads that changed were recorded
+    with open(recordPath) as f:
+        assert len(f.readlines()) == 3
+
+    replayed = ReplayServer(recordPath)
+    replayed.start()
+    try:
+        scorer, replayedDelivered = scorerFor(replayed)
+        scorer.run(polls=4)
+    finally:
+        replayed.stop()
+
+    assert replayedDelivered == delivered
+
+
+def test_nothing_is_delivered_after_stop(replay):
+
+    server = replay([scoreboard((1, 2))])
+    scorer, delivered = scorerFor(server)
+
+    scorer.stop(wait=False)
+    scorer.poll()
+
+    assert delivered == []
@@ -0,0 +1,96 @@
+from datetime import date
+import math
+
+import numpy
+import pytest
+
+from fantasy import Fantasy
+from running_stats import RunningStats, RollingStats
+from synthetic import SyntheticLeague, SyntheticPlayer
+
+SCORES = [112.4, 98.1, 131.0, 87.65, 140.2, 101.3, 99.9, 120.0]
+
+# a season that is still in progress, so Fantasy treats the current week as incomplete
+YEAR = date.today().year
+
+
+def test_running_stats_matches_numpy():
+
+    stats = RunningStats(SCORES[:3])
+    stats.extend(SCORES[3:])
+
+    assert stats.count == len(SCORES)
+    assert stats.mean == pytest.approx(numpy.mean(SCORES))
+    assert stats.variance == pytest.approx(numpy.var(SCORES))
+    assert stats.std == pytest.approx(numpy.std(SCORES))
+
+
+def test_running_stats_empty():
+
+    stats = RunningStats()
+
+    assert stats.count == 0
+    assert math.isnan(stats.mean)
+    assert math.isnan(stats.std)
+
+
+def test_rolling_stats_covers_last_window():
+
+    stats = RollingStats(4)
+    for i, score in enumerate(SCORES):
+        stats.add(score)
+        recent = SCORES[max(0, i - 3):i + 1]
+
+        assert stats.count == len(recent)
+        assert stats.mean == pytest.approx(numpy.mean(recent))
+        assert stats.std == pytest.approx(numpy.std(recent))
+
+
+def test_add_week_matches_rebuild():
+
+    league = SyntheticLeague(numTeams=8, rosterSize=16, weeks=6, year=YEAR, seed=3)
+    league.current_week = 5
+    fantasy = Fantasy(league)
+
+    fantasy.addWeek(league.box_scores(5), league.box_scores(6))
+
+    league.current_week = 6
+    rebuilt = Fantasy(league)
+
+    assert fantasy.league.current_week == 6
+    assert fantasy.scores == rebuilt.scores
+    assert fantasy.weeklyRanks == rebuilt.weeklyRanks
+    assert fantasy.avgPosRanks == rebuilt.avgPosRanks
+    for team in rebuilt.avgScores:
+        assert fantasy.avgScores[team] == pytest.approx(rebuilt.avgScores[team])
+        assert fantasy.scoreStdDev[team] == pytest.approx(rebuilt.scoreStdDev[team])
+        assert fantasy.rollingScores[team].mean == pytest.approx(rebuilt.rollingScores[team].mean)
+
+
+def test_add_week_picks_up_roster_changes():
+
+    league = SyntheticLeague(numTeams=8, rosterSize=16, weeks=6, year=YEAR, seed=4)
+    league.current_week = 5
+    fantasy = Fantasy(league)
+
+    # a waiver pickup replaces a starter of the first team, and another player's rank moves, before week 6
+    team = league.teams[0]
+    dropped = team.roster[1]
+    pickup = SyntheticPlayer("Waiver Pickup", dropped.position, 3)
+    team.roster[1] = pickup
+    team.roster[2].posRank += 20
+
+    for boxscore in league.box_scores(6):
+        for lineup in (boxscore.home_lineup, boxscore.away_lineup):
+            for i, player in enumerate(lineup):
+                if player.name == dropped.name:
+                    lineup[i] = SyntheticPlayer(pickup.name, pickup.position, pickup.posRank, player.slot_position, player.points)
+
+    fantasy.addWeek(league.box_scores(5), league.box_scores(6), teams=league.teams)
+
+    league.current_week = 6
+    rebuilt = Fantasy(league)
+
+    assert fantasy.avgPosRanks == rebuilt.avgPosRanks
+    assert fantasy.avgPosRanksEntireTeam == rebuilt.avgPosRanksEntireTeam
+    assert fantasy.posRanksStdDev == rebuilt.posRanksStdDev
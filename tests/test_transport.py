@@ -0,0 +1,88 @@
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from threading import Thread
+
+import pytest
+import requests
+
+from transport import Transport, ReplayMiss
+
+
+@pytest.fixture
+def server():
+
+    hits = []
+
+    class Handler(BaseHTTPRequestHandler):
+
+        def do_GET(self):
+            hits.append(self.path)
+            body = ('{"path": "' + self.path + '", "hit": ' + str(len(hits)) + '}').encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+
+    yield "http://127.0.0.1:" + str(httpd.server_address[1]), hits
+
+    httpd.shutdown()
+    httpd.server_close()
+    thread.join()
+
+
+def test_record_then_replay(server, tmp_path):
+
+    url, hits = server
+    archive = str(tmp_path / "archive.jsonl.gz")
+
+    with Transport('record', archive):
+        first = requests.get(url + "/league", params={'view': 'mTeam', 'scoringPeriodId': 1}).json()
+        second = requests.get(url + "/league", params={'view': 'mTeam', 'scoringPeriodId': 1}).json()
+
+    assert len(hits) == 2
+
+    with Transport('replay', archive):
+        # the query parameters are matched regardless of their order
+        replayed = requests.get(url + "/league", params={'scoringPeriodId': 1, 'view': 'mTeam'})
+        assert replayed.status_code == 200
+        assert replayed.json() == first
+        assert requests.get(url + "/league", params={'view': 'mTeam', 'scoringPeriodId': 1}).json() == second
+
+        # the last recorded response repeats once the recording runs out
+        assert requests.get(url + "/league", params={'view': 'mTeam', 'scoringPeriodId': 1}).json() == second
+
+    assert len(hits) == 2
+
+
+def test_replay_miss(server, tmp_path):
+
+    url, hits = server
+    archive = str(tmp_path / "archive.jsonl.gz")
+
+    with Transport('record', archive):
+        requests.get(url + "/league", headers={'x-fantasy-filter': '{"week": 1}'})
+
+    with Transport('replay', archive):
+        with pytest.raises(ReplayMiss):
+            requests.get(url + "/league", headers={'x-fantasy-filter': '{"week": 2}'})
+        with pytest.raises(ReplayMiss):
+            requests.get(url + "/other")
+
+    assert len(hits) == 1
+
+
+def test_uninstall_restores_send(tmp_path):
+
+    send = requests.Session.send
+
+    with Transport('record', str(tmp_path / "archive.jsonl.gz")):
+        assert requests.Session.send is not send
+
+    assert requests.Session.send is send
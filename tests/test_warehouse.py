@@ -0,0 +1,145 @@
+from contextlib import closing
+from datetime import date
+import logging
+import sqlite3
+
+import pytest
+
+import fantasy
+import warehouse
+from fantasy import Fantasy
+from synthetic import SyntheticLeague
+from warehouse import Warehouse, Between, where
+
+LEAGUE_ID = 42
+
+# a season that is still in progress and one that is over
+YEAR = date.today().year
+COMPLETED_YEAR = 2020
+
+
+class ByeBoxScore:
+    """
+    Playoff bye as espn_api returns it: the away team is None.
+    """
+
+    def __init__(self, team, lineup):
+
+        self.home_team = team
+        self.away_team = None
+        self.home_score = 120.5
+        self.away_score = 0
+        self.home_lineup = lineup
+        self.away_lineup = []
+
+
+def byeLeague(year):
+
+    league = SyntheticLeague(numTeams=4, rosterSize=16, weeks=4, year=year, seed=5)
+    week = league.box_scores(4)
+    week[0] = ByeBoxScore(week[0].home_team, week[0].home_lineup)
+    return league
+
+
+@pytest.fixture
+def store(tmp_path):
+
+    with Warehouse(str(tmp_path / "fantasy.db")) as store:
+        yield store
+
+
+def test_where():
+
+    assert where({}) == ("", [])
+    assert where({'year': None}) == ("", [])
+
+    clause, parameters = where({'league_id': 1, 'week': Between(2, 5), 'team_abbrev': ['A', 'B']})
+
+    assert clause == " WHERE league_id = ? AND week BETWEEN ? AND ? AND team_abbrev IN (?, ?)"
+    assert parameters == [1, 2, 5, 'A', 'B']
+
+
+def test_query_predicates(store):
+
+    store.saveFantasy(Fantasy(SyntheticLeague(numTeams=4, weeks=6, year=YEAR, seed=1)), LEAGUE_ID)
+
+    weeks = {row[0] for row in store.query('boxscores', 'week', league_id=LEAGUE_ID, week=Between(2, 4))}
+    assert weeks == {2, 3, 4}
+
+    rows = store.query('lineups', 'team_abbrev', week=1, team_abbrev=('T001', 'T003'))
+    assert rows and {row[0] for row in rows} == {'T001', 'T003'}
+
+    assert store.query('leagues', league_id=LEAGUE_ID + 1) == []
+
+
+@pytest.mark.parametrize('year', [YEAR, COMPLETED_YEAR])
+def test_round_trip_matches_fantasy(store, year):
+
+    original = Fantasy(byeLeague(year))
+    store.saveFantasy(original, LEAGUE_ID)
+
+    rebuilt = Fantasy(store.league(LEAGUE_ID, year))
+
+    assert rebuilt.completed == original.completed
+    assert rebuilt.scores == original.scores
+    assert rebuilt.weeklyRanks == original.weeklyRanks
+    assert rebuilt.avgPosRanks == original.avgPosRanks
+    assert rebuilt.avgPosRanksEntireTeam == original.avgPosRanksEntireTeam
+
+    seasons = store.teamSeasons(LEAGUE_ID, years=year)
+    assert {key[2] for key in seasons} == set(original.scores)
+    for (_, _, team), season in seasons.items():
+        assert season['weeks'] == len(original.scores[team])
+        assert season['avgScore'] == pytest.approx(original.avgScores[team])
+        assert season['scoreStdDev'] == pytest.approx(original.scoreStdDev[team])
+
+
+def test_season_saved_in_progress_stays_in_progress(store, monkeypatch):
+
+    # saved during its last week, read back once the season is over
+    with monkeypatch.context() as patch:
+        patch.setattr(fantasy, 'seasonCompleted', lambda year: False)
+        saved = Fantasy(SyntheticLeague(numTeams=4, weeks=4, year=COMPLETED_YEAR, seed=3))
+        store.saveFantasy(saved, LEAGUE_ID)
+
+    rebuilt = Fantasy(store.league(LEAGUE_ID, COMPLETED_YEAR))
+
+    assert not rebuilt.completed
+    assert rebuilt.scores == saved.scores
+    assert all(len(scores) == 3 for scores in rebuilt.scores.values())
+    assert {row[2] for row in store.scores(LEAGUE_ID, years=COMPLETED_YEAR)} == {1, 2, 3}
+    assert all(season['weeks'] == 3 for season in store.teamSeasons(LEAGUE_ID, years=COMPLETED_YEAR).values())
+
+
+def test_migrate_adds_completed(tmp_path):
+
+    path = str(tmp_path / "fantasy.db")
+    with closing(sqlite3.connect(path)) as connection, connection:
+        connection.execute("CREATE TABLE leagues (league_id INTEGER NOT NULL, year INTEGER NOT NULL,"
+                           " current_week INTEGER NOT NULL, PRIMARY KEY (league_id, year))")
+        connection.executemany("INSERT INTO leagues VALUES (?, ?, ?)", [(LEAGUE_ID, COMPLETED_YEAR, 17), (LEAGUE_ID, YEAR, 1)])
+
+    with Warehouse(path) as store:
+        assert sorted(store.query('leagues', 'year, completed')) == [(COMPLETED_YEAR, 1), (YEAR, 0)]
+
+
+def test_bye_is_stored_without_away_team(store):
+
+    store.saveFantasy(Fantasy(byeLeague(COMPLETED_YEAR)), LEAGUE_ID)
+
+    assert store.query('boxscores', 'away_abbrev', week=4, matchup=0) == [(None,)]
+    assert store.league(LEAGUE_ID, COMPLETED_YEAR).box_scores(4)[0].away_team is None
+
+
+def test_unwritable_warehouse_does_not_fail_load(tmp_path, monkeypatch, caplog):
+
+    # a directory cannot be opened as a database
+    monkeypatch.setattr(fantasy, 'WAREHOUSE_PATH', str(tmp_path))
+    monkeypatch.setattr(warehouse, 'WAREHOUSE_PATH', str(tmp_path))
+    monkeypatch.setattr(fantasy, 'connectLeague', lambda leagueId, year: SyntheticLeague(numTeams=4, weeks=3, year=year))
+
+    with caplog.at_level(logging.WARNING, logger='fantasy'):
+        loaded = Fantasy(leagueId=LEAGUE_ID, year=YEAR)
+
+    assert loaded.scores
+    assert "Could not save league" in caplog.text
@@ -0,0 +1,308 @@
+from functools import wraps
+from threading import Lock, local, get_ident
+import atexit
+import json
+import os
+import time
+import tracemalloc
+
+# Tracing is off unless FANTASY_TRACE names a file to write the Chrome trace to (or enable() is called).
+# While it is off, span() hands back a shared no-op object and traced functions are called directly,
+# so the instrumentation costs one flag check per call.
+_enabled = False
+_memory = False
+# whether the recorded events were timed with memory tracking on, kept after disable() for the reports
+_memoryTimed = False
+_events = []
+_lock = Lock()
+_stacks = local()
+_open = []
+_origin = time.perf_counter()
+
+
+class _NullSpan:
+    """
+    Span returned while tracing is disabled. Does nothing.
+    """
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Span:
+    """
+    Class that times one phase of the pipeline. Use it through span() as a context manager.
+    On exit it records the phase's wall time and, when memory tracking is on, the peak traced
+    memory reached while it was open (including inside nested spans).
+
+    tracemalloc keeps one peak for the whole process, so the peak of a span that was open at the
+    same time as a span on another thread (e.g. batch.py's workers, or the GUI loading the league
+    in the background) would include the other thread's allocations and be cut short by its resets.
+    Such spans are marked overlapped and record no peak.
+
+    Attributes:
+        name (str)
+            - the name of the phase
+        args (dict)
+            - extra details shown in the trace viewer
+    """
+
+    __slots__ = ('name', 'args', '_start', '_peak', '_thread', '_overlapped')
+
+    def __init__(self, name, args):
+
+        self.name = name
+        self.args = args
+        self._start = 0.0
+        self._peak = 0
+        self._thread = None
+        self._overlapped = False
+
+
+    def __enter__(self):
+
+        stack = _stack()
+
+        if _memory:
+            self._thread = get_ident()
+            with _lock:
+                _open.append(self)
+                if any(other._thread != self._thread for other in _open):
+                    for other in _open:
+                        other._overlapped = True
+
+            current, peak = tracemalloc.get_traced_memory()
+            if stack:
+                stack[-1]._peak = max(stack[-1]._peak, peak)
+            tracemalloc.reset_peak()
+            self._peak = current
+
+        stack.append(self)
+        self._start = time.perf_counter()
+        return self
+
+
+    def __exit__(self, *exc):
+
+        end = time.perf_counter()
+        stack = _stack()
+        stack.pop()
+
+        event = {
+            'name': self.name,
+            'ph': 'X',
+            'ts': (self._start - _origin) * 1e6,
+            'dur': (end - self._start) * 1e6,
+            'pid': os.getpid(),
+            'tid': get_ident(),
+            'args': dict(self.args)
+        }
+
+        if self._thread is not None:
+            with _lock:
+                _open.remove(self)
+
+            if self._overlapped:
+                event['args']['peak_bytes'] = None
+            else:
+                self._peak = max(self._peak, tracemalloc.get_traced_memory()[1])
+                event['args']['peak_bytes'] = self._peak
+                if stack:
+                    stack[-1]._peak = max(stack[-1]._peak, self._peak)
+                tracemalloc.reset_peak()
+
+        with _lock:
+            _events.append(event)
+
+        return False
+
+
+def _stack():
+
+    stack = getattr(_stacks, 'stack', None)
+    if stack is None:
+        stack = _stacks.stack = []
+    return stack
+
+
+def span(name, **args):
+    """
+    Returns a context manager that times the phase called name.
+
+    Parameters:
+        name (str): the name of the phase
+        args: extra details to attach to the trace event
+
+    Returns:
+        span (Span): the span, or a no-op stand-in while tracing is disabled
+    """
+
+    if not _enabled:
+        return _NULL_SPAN
+    return Span(name, args)
+
+
+def traced(name=None):
+    """
+    Decorator that times every call of the decorated function as a span.
+
+    Parameters:
+        name (str): the name of the phase (optional, defaults to the function's qualified name)
+
+    Returns:
+        decorator (function): the decorator
+    """
+
+    def decorator(function):
+        spanName = name or function.__qualname__
+
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return function(*args, **kwargs)
+            with Span(spanName, {}):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def enable(memory=False):
+    """
+    Turns tracing on and clears any events recorded before.
+
+    Parameters:
+        memory (bool): also track the peak memory of each span with tracemalloc (off by default); this slows the
+                       program down and so inflates the timings, and spans that overlap spans on other threads record no peak
+
+    Returns: none
+    """
+
+    global _enabled, _memory, _memoryTimed
+
+    with _lock:
+        _events.clear()
+
+    _memory = memory
+    _memoryTimed = memory
+    if memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+    _enabled = True
+
+
+def disable():
+    """
+    Turns tracing off. The recorded events are kept for export.
+    """
+
+    global _enabled, _memory
+
+    _enabled = False
+    if _memory:
+        tracemalloc.stop()
+        _memory = False
+
+
+def enabled():
+    return _enabled
+
+
+def events():
+    """
+    Returns a copy of the recorded trace events.
+    """
+
+    with _lock:
+        return list(_events)
+
+
+def exportChromeTrace(path):
+    """
+    Writes the recorded spans as a Chrome trace, which can be opened in chrome://tracing or Perfetto.
+
+    Parameters:
+        path (str): the JSON file to write
+
+    Returns: none
+    """
+
+    with open(path, 'w') as f:
+        json.dump({'traceEvents': events(), 'displayTimeUnit': 'ms', 'otherData': {'memoryTracking': _memoryTimed}}, f)
+
+
+def summary():
+    """
+    Returns the recorded spans aggregated by name.
+
+    Parameters: none
+
+    Returns:
+        phases (dict): dictionary with the phase name as the key and a dict of calls, total_ms, mean_ms
+                       and peak_mb (None if no call has a peak) as the value, ordered by total time
+    """
+
+    phases = {}
+
+    for event in events():
+        phase = phases.setdefault(event['name'], {'calls': 0, 'total_ms': 0.0, 'peak_mb': None})
+        phase['calls'] += 1
+        phase['total_ms'] += event['dur'] / 1000
+        if event['args'].get('peak_bytes') is not None:
+            phase['peak_mb'] = max(phase['peak_mb'] or 0.0, event['args']['peak_bytes'] / 2 ** 20)
+
+    for phase in phases.values():
+        phase['mean_ms'] = phase['total_ms'] / phase['calls']
+
+    return dict(sorted(phases.items(), key=lambda item: item[1]['total_ms'], reverse=True))
+
+
+def printSummary():
+    """
+    Prints the summary table of per-phase wall time, call counts and peak memory.
+    """
+
+    phases = summary()
+    if not phases:
+        return
+
+    if _memoryTimed:
+        print("Timed with memory tracking on, which slows every phase down; leave FANTASY_TRACE_MEMORY unset for accurate times")
+
+    print("{:<40}{:>8}{:>14}{:>12}{:>12}".format("Phase", "Calls", "Total (ms)", "Mean (ms)", "Peak (MB)"))
+    for name, phase in phases.items():
+        peak = "" if phase['peak_mb'] is None else "{:.1f}".format(phase['peak_mb'])
+        print("{:<40}{:>8}{:>14.1f}{:>12.2f}{:>12}".format(name, phase['calls'], phase['total_ms'], phase['mean_ms'], peak))
+
+
+def enableFromEnv():
+    """
+    Turns tracing on if FANTASY_TRACE is set. At exit the Chrome trace is written to the file it names
+    and the summary table is printed. FANTASY_TRACE_MEMORY=1 also tracks the peak memory of each phase,
+    at the cost of slower, less accurate timings.
+
+    Parameters: none
+
+    Returns: none
+    """
+
+    path = os.getenv("FANTASY_TRACE")
+    if not path or _enabled:
+        return
+
+    enable(memory=os.getenv("FANTASY_TRACE_MEMORY", "0") == "1")
+
+    def export():
+        exportChromeTrace(path)
+        printSummary()
+
+    atexit.register(export)
@@ -0,0 +1,468 @@
+from datetime import timedelta
+from threading import Lock
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+import atexit
+import base64
+import gzip
+import hashlib
+import json
+import os
+import sys
+import time
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+# The transport is configured through environment variables, next to LEAGUE_ID, ESPN_S2 and SWID:
+#   ESPN_TRANSPORT - 'live' (default), 'record' or 'replay'
+#   ESPN_ARCHIVE   - the archive file to record to or replay from (default espn_archive.jsonl.gz)
+#   ESPN_LATENCY   - 'recorded' to replay with the recorded response times, 'zero' (default) to replay instantly
+MODES = ('live', 'record', 'replay')
+LATENCIES = ('recorded', 'zero')
+DEFAULT_ARCHIVE = "espn_archive.jsonl.gz"
+
+# request headers that change the response and so belong in the archive key
+KEY_HEADERS = ('x-fantasy-filter',)
+
+# response headers that describe the wire encoding rather than the stored body
+DROP_HEADERS = ('content-encoding', 'content-length', 'transfer-encoding', 'set-cookie')
+
+_originalSend = requests.Session.send
+_installed = None
+
+
+class ReplayMiss(requests.exceptions.ConnectionError):
+    """
+    Raised in replay mode when a request has no recorded response.
+    """
+
+
+class Transport:
+    """
+    Class that sits under every requests call in the process, including the ones espn_api makes,
+    and records the responses to a compact local archive or replays them from it.
+
+    Requests are matched on method, url (with the query parameters sorted), the headers in KEY_HEADERS
+    and the body. When the same request was recorded more than once, e.g. while polling live scores,
+    the responses are replayed in the order they were recorded and the last one repeats.
+
+    Attributes:
+        mode (str)
+            - 'record' or 'replay'
+        archivePath (str)
+            - the gzip compressed JSON lines archive
+        latency (str)
+            - 'recorded' to sleep for each response's recorded time on replay, 'zero' to return at once
+        entries (dict)
+            - the recorded responses of each request key, in order
+
+    Methods:
+        install()
+        uninstall()
+        send()
+        save()
+    """
+
+    def __init__(self, mode, archivePath=DEFAULT_ARCHIVE, latency='zero'):
+
+        if mode not in ('record', 'replay'):
+            raise ValueError("mode must be 'record' or 'replay', not " + repr(mode))
+        if latency not in LATENCIES:
+            raise ValueError("latency must be one of " + ", ".join(LATENCIES) + ", not " + repr(latency))
+
+        self.mode = mode
+        self.archivePath = archivePath
+        self.latency = latency
+
+        self.entries = {}
+        self._replayed = {}
+        self._lock = Lock()
+        self._previous = None
+
+        if mode == 'replay':
+            self.entries = loadArchive(archivePath)
+
+
+    def __enter__(self):
+        self.install()
+        return self
+
+
+    def __exit__(self, *exc):
+        self.uninstall()
+
+
+    def install(self):
+        """
+        Routes every requests.Session.send in the process through this transport.
+
+        Parameters: none
+
+        Returns: none
+        """
+
+        global _installed
+
+        transport = self
+
+        def send(session, request, **kwargs):
+            return transport.send(session, request, **kwargs)
+
+        self._previous = requests.Session.send
+        requests.Session.send = send
+        _installed = self
+
+        if self.mode == 'record':
+            atexit.register(self.save)
+
+
+    def uninstall(self):
+        """
+        Restores the requests.Session.send that was installed before and, in record mode, writes the archive.
+
+        Parameters: none
+
+        Returns: none
+        """
+
+        global _installed
+
+        requests.Session.send = self._previous
+        _installed = None
+
+        if self.mode == 'record':
+            atexit.unregister(self.save)
+            self.save()
+
+
+    def send(self, session, request, **kwargs):
+        """
+        Sends a prepared request, recording or replaying its response depending on the mode.
+
+        Parameters:
+            session (requests.Session): the session sending the request
+            request (requests.PreparedRequest): the request
+
+        Returns:
+            response (requests.Response): the live or replayed response
+        """
+
+        key = requestKey(request)
+
+        if self.mode == 'record':
+            response = _originalSend(session, request, **kwargs)
+            entry = {
+                'key': key,
+                'method': request.method,
+                'url': request.url,
+                'status': response.status_code,
+                'reason': response.reason,
+                'headers': {name: value for name, value in response.headers.items() if name.lower() not in DROP_HEADERS},
+                'elapsed': round(response.elapsed.total_seconds(), 4)
+            }
+            entry.update(encodeBody(response.content))
+            with self._lock:
+                self.entries.setdefault(key, []).append(entry)
+            return response
+
+        with self._lock:
+            recorded = self.entries.get(key)
+            if not recorded:
+                raise ReplayMiss("no recorded response for " + request.method + " " + request.url)
+            index = self._replayed.get(key, 0)
+            self._replayed[key] = index + 1
+            entry = recorded[min(index, len(recorded) - 1)]
+
+        if self.latency == 'recorded':
+            time.sleep(entry['elapsed'])
+
+        return buildResponse(entry, request)
+
+
+    def save(self):
+        """
+        Writes every recorded response to the archive.
+
+        Parameters: none
+
+        Returns: none
+        """
+
+        with self._lock:
+            entries = [entry for recorded in self.entries.values() for entry in recorded]
+
+        with gzip.open(self.archivePath, 'wt', encoding='utf-8') as f:
+            for entry in entries:
+                f.write(json.dumps(entry, separators=(',', ':')) + "\n")
+
+
+class RateLimiter:
+    """
+    Token bucket shared by every thread: allows `rate` requests per second on average, with bursts of up to `burst`.
+
+    Methods:
+        wait()
+    """
+
+    def __init__(self, rate, burst=1):
+
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+
+        self.rate = rate
+        self.burst = max(burst, 1)
+
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = Lock()
+
+
+    def wait(self):
+        """
+        Blocks until a request may be sent.
+
+        Parameters: none
+
+        Returns: none
+        """
+
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+
+                delay = (1 - self._tokens) / self.rate
+
+            time.sleep(delay)
+
+
+class ConnectionPool:
+    """
+    Class that sends every requests call in the process, including the ones espn_api makes with
+    requests.get, over one shared Session, so connections to ESPN are kept alive and reused across
+    threads, and holds all of them to a global rate limit.
+
+    It wraps whatever requests.Session.send is installed when it is, so it can sit on top of a
+    recording or replaying Transport.
+
+    Attributes:
+        session (requests.Session)
+            - the shared session whose connection pool every request uses
+        limiter (RateLimiter)
+            - the global rate limit, or None for no limit
+
+    Methods:
+        install()
+        uninstall()
+        send()
+    """
+
+    def __init__(self, size=10, rate=None, burst=1):
+
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=size, pool_maxsize=size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        self.limiter = RateLimiter(rate, burst) if rate else None
+
+        self._next = None
+
+
+    def __enter__(self):
+        self.install()
+        return self
+
+
+    def __exit__(self, *exc):
+        self.uninstall()
+
+
+    def install(self):
+        """
+        Routes every requests.Session.send in the process through the shared session.
+
+        Parameters: none
+
+        Returns: none
+        """
+
+        self._next = requests.Session.send
+        pool = self
+
+        def send(session, request, **kwargs):
+            return pool.send(session, request, **kwargs)
+
+        requests.Session.send = send
+
+
+    def uninstall(self):
+        """
+        Restores the requests.Session.send that was installed before and closes the pooled connections.
+
+        Parameters: none
+
+        Returns: none
+        """
+
+        requests.Session.send = self._next
+        self.session.close()
+
+
+    def send(self, session, request, **kwargs):
+        """
+        Waits for the rate limit and sends the prepared request over the shared session.
+
+        Parameters:
+            session (requests.Session): the session the caller used, ignored
+            request (requests.PreparedRequest): the request
+
+        Returns:
+            response (requests.Response): the response
+        """
+
+        if self.limiter is not None:
+            self.limiter.wait()
+
+        return self._next(self.session, request, **kwargs)
+
+
+def requestKey(request):
+    """
+    Returns the archive key of a prepared request.
+
+    Parameters:
+        request (requests.PreparedRequest): the request
+
+    Returns:
+        key (str): hex digest identifying the request
+    """
+
+    parts = urlsplit(request.url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    url = urlunsplit((parts.scheme, parts.netloc, parts.path, query, ''))
+
+    digest = hashlib.sha1()
+    digest.update(request.method.encode())
+    digest.update(url.encode())
+    for header in KEY_HEADERS:
+        digest.update((header + ":" + request.headers.get(header, '')).encode())
+
+    body = request.body or b''
+    if isinstance(body, str):
+        body = body.encode()
+    digest.update(body)
+
+    return digest.hexdigest()
+
+
+def encodeBody(content):
+    """
+    Returns the archive fields for a response body: plain text when it is UTF-8, base64 otherwise.
+    """
+
+    try:
+        return {'text': content.decode('utf-8')}
+    except UnicodeDecodeError:
+        return {'body64': base64.b64encode(content).decode('ascii')}
+
+
+def buildResponse(entry, request):
+    """
+    Returns a requests.Response rebuilt from an archive entry.
+
+    Parameters:
+        entry (dict): the recorded response
+        request (requests.PreparedRequest): the request being answered
+
+    Returns:
+        response (requests.Response): the replayed response
+    """
+
+    response = requests.Response()
+    response.status_code = entry['status']
+    response.reason = entry.get('reason')
+    response.headers = CaseInsensitiveDict(entry['headers'])
+    response.url = request.url
+    response.request = request
+    response.elapsed = timedelta(seconds=entry['elapsed'])
+    response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+
+    if 'text' in entry:
+        response._content = entry['text'].encode('utf-8')
+    else:
+        response._content = base64.b64decode(entry['body64'])
+
+    return response
+
+
+def loadArchive(archivePath):
+    """
+    Returns the recorded responses of an archive, grouped by request key in recording order.
+
+    Parameters:
+        archivePath (str): the archive file
+
+    Returns:
+        entries (dict): dictionary with the request key as the key and a list of recorded responses as the value
+    """
+
+    entries = {}
+
+    with gzip.open(archivePath, 'rt', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                entry = json.loads(line)
+                entries.setdefault(entry['key'], []).append(entry)
+
+    return entries
+
+
+def installFromEnv():
+    """
+    Installs the transport configured by ESPN_TRANSPORT, ESPN_ARCHIVE and ESPN_LATENCY.
+    Calling it again returns the transport that is already installed.
+
+    Parameters: none
+
+    Returns:
+        transport (Transport): the installed transport, or None in live mode
+    """
+
+    if _installed is not None:
+        return _installed
+
+    mode = os.getenv("ESPN_TRANSPORT", "live")
+    if mode not in MODES:
+        raise ValueError("ESPN_TRANSPORT must be one of " + ", ".join(MODES) + ", not " + repr(mode))
+    if mode == 'live':
+        return None
+
+    transport = Transport(
+        mode,
+        archivePath=os.getenv("ESPN_ARCHIVE", DEFAULT_ARCHIVE),
+        latency=os.getenv("ESPN_LATENCY", "zero")
+    )
+    transport.install()
+
+    return transport
+
+
+if __name__ == "__main__":
+
+    # Summarize an archive: python transport.py espn_archive.jsonl.gz
+    archivePath = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_ARCHIVE
+    entries = loadArchive(archivePath)
+
+    responses = sum(len(recorded) for recorded in entries.values())
+    recordedTime = sum(entry['elapsed'] for recorded in entries.values() for entry in recorded)
+
+    print("Archive:", archivePath, "(" + str(os.path.getsize(archivePath)) + " bytes)")
+    print("Requests:", len(entries))
+    print("Responses:", responses)
+    print("Recorded network time: " + str(round(recordedTime, 2)) + "s")
@@ -0,0 +1,468 @@
+from contextlib import closing
+import os
+import sqlite3
+
+from running_stats import RunningStats
+from snapshot import PlayerRecord, TeamRecord, BoxScoreRecord, seasonCompleted
+
+# Fantasy loads from ESPN and make_dataset.py runs are copied into this SQLite file.
+# Set FANTASY_WAREHOUSE to another path to move it, or to an empty string to turn the copying off.
+WAREHOUSE_PATH = os.getenv("FANTASY_WAREHOUSE", "fantasy.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS leagues (
+    league_id INTEGER NOT NULL,
+    year INTEGER NOT NULL,
+    current_week INTEGER NOT NULL,
+    completed INTEGER NOT NULL,
+    PRIMARY KEY (league_id, year)
+);
+CREATE TABLE IF NOT EXISTS teams (
+    league_id INTEGER NOT NULL,
+    year INTEGER NOT NULL,
+    team_abbrev TEXT NOT NULL,
+    team_id INTEGER,
+    team_name TEXT,
+    PRIMARY KEY (league_id, year, team_abbrev)
+);
+CREATE TABLE IF NOT EXISTS rosters (
+    league_id INTEGER NOT NULL,
+    year INTEGER NOT NULL,
+    team_abbrev TEXT NOT NULL,
+    name TEXT NOT NULL,
+    position TEXT,
+    pos_rank INTEGER
+);
+CREATE INDEX IF NOT EXISTS rosters_team ON rosters (league_id, year, team_abbrev);
+CREATE INDEX IF NOT EXISTS rosters_name ON rosters (name);
+CREATE TABLE IF NOT EXISTS boxscores (
+    league_id INTEGER NOT NULL,
+    year INTEGER NOT NULL,
+    week INTEGER NOT NULL,
+    matchup INTEGER NOT NULL,
+    home_abbrev TEXT NOT NULL,
+    away_abbrev TEXT,
+    home_score REAL,
+    away_score REAL,
+    PRIMARY KEY (league_id, year, week, matchup)
+);
+CREATE INDEX IF NOT EXISTS boxscores_home ON boxscores (home_abbrev, league_id, year);
+CREATE INDEX IF NOT EXISTS boxscores_away ON boxscores (away_abbrev, league_id, year);
+CREATE TABLE IF NOT EXISTS lineups (
+    league_id INTEGER NOT NULL,
+    year INTEGER NOT NULL,
+    week INTEGER NOT NULL,
+    team_abbrev TEXT NOT NULL,
+    name TEXT NOT NULL,
+    position TEXT,
+    slot_position TEXT,
+    pos_rank INTEGER,
+    points REAL
+);
+CREATE INDEX IF NOT EXISTS lineups_team ON lineups (league_id, year, week, team_abbrev);
+CREATE INDEX IF NOT EXISTS lineups_name ON lineups (name, year);
+CREATE TABLE IF NOT EXISTS player_weeks (
+    season INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    position TEXT,
+    week INTEGER NOT NULL,
+    points REAL,
+    PRIMARY KEY (season, name, week)
+);
+CREATE INDEX IF NOT EXISTS player_weeks_position ON player_weeks (season, position, week);
+CREATE TABLE IF NOT EXISTS player_stats (
+    season INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    week INTEGER NOT NULL,
+    stat TEXT NOT NULL,
+    value REAL,
+    PRIMARY KEY (season, name, week, stat)
+);
+CREATE INDEX IF NOT EXISTS player_stats_stat ON player_stats (season, stat, week);
+"""
+
+
+class Between:
+    """
+    Predicate matching values from low to high, both included. Pass it as a query keyword, e.g. weeks=Between(1, 8).
+    """
+
+    def __init__(self, low, high):
+
+        self.low = low
+        self.high = high
+
+
+def where(predicates):
+    """
+    Returns the SQL WHERE clause and its parameters for keyword predicates. None matches everything,
+    a list, tuple or set matches any of its values, a Between matches a range and anything else matches by equality.
+
+    Parameters:
+        predicates (dict): dictionary with the column as the key and the predicate as the value
+
+    Returns:
+        clause (str): the WHERE clause, or an empty string if nothing is filtered
+        parameters (list): the parameters of the clause
+    """
+
+    conditions = []
+    parameters = []
+
+    for column, predicate in predicates.items():
+        if predicate is None:
+            continue
+        if isinstance(predicate, Between):
+            conditions.append(column + " BETWEEN ? AND ?")
+            parameters += [predicate.low, predicate.high]
+        elif isinstance(predicate, (list, tuple, set)):
+            predicate = list(predicate)
+            conditions.append(column + " IN (" + ", ".join("?" * len(predicate)) + ")")
+            parameters += predicate
+        else:
+            conditions.append(column + " = ?")
+            parameters.append(predicate)
+
+    if not conditions:
+        return "", parameters
+    return " WHERE " + " AND ".join(conditions), parameters
+
+
+class WarehouseLeague:
+    """
+    Stand-in for an espn_api League rebuilt from the warehouse, so Fantasy(league=...) can be built offline.
+
+    Attributes:
+        league_id (int)
+            - the league id
+        year (int)
+            - the season
+        current_week (int)
+            - the current week when the league was saved
+        teams (list)
+            - the TeamRecords of the league
+        completed (bool)
+            - whether the season was completed when the league was saved, i.e. whether the current week is final
+
+    Methods:
+        box_scores()
+    """
+
+    def __init__(self, league_id, year, current_week, teams, boxscores, completed=False):
+
+        self.league_id = league_id
+        self.year = year
+        self.current_week = current_week
+        self.teams = teams
+        self._boxscores = boxscores
+        self.completed = completed
+
+
+    def box_scores(self, week):
+        return self._boxscores.get(week, [])
+
+
+class Warehouse:
+    """
+    Class that stores leagues, lineups, rosters and per-player weekly stats in an indexed SQLite file
+    and answers historical questions from it without touching the network.
+
+    Every query takes keyword predicates (see where()) that are turned into the SQL WHERE clause,
+    so only the matching rows are read from disk.
+
+    Attributes:
+        path (str)
+            - the SQLite file
+
+    Methods:
+        migrate()
+        saveFantasy()
+        savePlayerStats()
+        query()
+        scores()
+        teamSeasons()
+        league()
+        playerStats()
+    """
+
+    def __init__(self, path=None):
+
+        self.path = path or WAREHOUSE_PATH
+
+        # a connection per Warehouse, so threads loading leagues in parallel each open their own
+        self.connection = sqlite3.connect(self.path, timeout=30)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+        self.migrate()
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+    def close(self):
+        self.connection.close()
+
+
+    def migrate(self):
+        """
+        Adds the leagues.completed column to warehouses written before it existed. Those seasons are marked
+        completed by the calendar, which is all that could be told about them.
+
+        Parameters: none
+
+        Returns: none
+        """
+
+        columns = [row[1] for row in self.connection.execute("PRAGMA table_info(leagues)")]
+        if 'completed' in columns:
+            return
+
+        with self.connection:
+            self.connection.execute("ALTER TABLE leagues ADD COLUMN completed INTEGER NOT NULL DEFAULT 0")
+            for year, in self.connection.execute("SELECT DISTINCT year FROM leagues").fetchall():
+                self.connection.execute("UPDATE leagues SET completed = ? WHERE year = ?", (int(seasonCompleted(year)), year))
+
+
+    def saveFantasy(self, fantasy, leagueId):
+        """
+        Stores a Fantasy object's league season, replacing what was stored for it before.
+        The missing team of a playoff bye is stored as NULL.
+
+        Parameters:
+            fantasy (Fantasy): the loaded league
+            leagueId (int): the league id
+
+        Returns: none
+        """
+
+        year = fantasy.league.year
+        key = {'league_id': leagueId, 'year': year}
+
+        teams = []
+        rosters = []
+        for team in fantasy.rosters:
+            teams.append((leagueId, year, team.team_abbrev, team.team_id, team.team_name))
+            for player in team.roster:
+                rosters.append((leagueId, year, team.team_abbrev, player.name, player.position, player.posRank))
+
+        boxscores = []
+        lineups = []
+        for week, matchups in enumerate(fantasy.all_boxscores, start=1):
+            for matchup, boxscore in enumerate(matchups):
+                away = None if boxscore.away_team is None else boxscore.away_team.team_abbrev
+                boxscores.append((leagueId, year, week, matchup, boxscore.home_team.team_abbrev,
+                                  away, boxscore.home_score, boxscore.away_score))
+                for team, lineup in ((boxscore.home_team, boxscore.home_lineup), (boxscore.away_team, boxscore.away_lineup)):
+                    if team is None:
+                        continue
+                    for player in lineup:
+                        lineups.append((leagueId, year, week, team.team_abbrev, player.name, player.position,
+                                        player.slot_position, player.posRank, player.points))
+
+        with self.connection:
+            clause, parameters = where(key)
+            for table in ('leagues', 'teams', 'rosters', 'boxscores', 'lineups'):
+                self.connection.execute("DELETE FROM " + table + clause, parameters)
+
+            self.connection.execute("INSERT INTO leagues VALUES (?, ?, ?, ?)",
+                                    (leagueId, year, fantasy.league.current_week, int(fantasy.completed)))
+            self.connection.executemany("INSERT INTO teams VALUES (?, ?, ?, ?, ?)", teams)
+            self.connection.executemany("INSERT INTO rosters VALUES (?, ?, ?, ?, ?, ?)", rosters)
+            self.connection.executemany("INSERT INTO boxscores VALUES (?, ?, ?, ?, ?, ?, ?, ?)", boxscores)
+            self.connection.executemany("INSERT INTO lineups VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", lineups)
+
+
+    def savePlayerStats(self, players, season, include=None):
+        """
+        Stores the weekly points and stat breakdown of espn_api players, replacing what was stored for them before.
+
+        Parameters:
+            players (list): the players, as returned by League.player_info
+            season (int): the season the stats belong to
+            include (function): returns whether a stat name should be stored (optional, defaults to every stat)
+
+        Returns: none
+        """
+
+        weeks = []
+        stats = []
+
+        for player in players:
+            for week in player.stats:
+                weeks.append((season, player.name, player.position, week, player.stats[week].get('points')))
+                for stat, value in player.stats[week].get('breakdown', {}).items():
+                    if isinstance(value, (int, float)) and (include is None or include(stat)):
+                        stats.append((season, player.name, week, stat, value))
+
+        with self.connection:
+            self.connection.executemany("INSERT OR REPLACE INTO player_weeks VALUES (?, ?, ?, ?, ?)", weeks)
+            self.connection.executemany("INSERT OR REPLACE INTO player_stats VALUES (?, ?, ?, ?, ?)", stats)
+
+
+    def query(self, table, columns="*", **predicates):
+        """
+        Returns the rows of a table that match the predicates.
+
+        Parameters:
+            table (str): the table
+            columns (str): the columns to select
+            predicates: the column predicates, see where()
+
+        Returns:
+            rows (list): the matching rows, as tuples
+        """
+
+        clause, parameters = where(predicates)
+        with closing(self.connection.execute("SELECT " + columns + " FROM " + table + clause, parameters)) as cursor:
+            return cursor.fetchall()
+
+
+    def scores(self, leagueId=None, years=None, teams=None, weeks=None, completeOnly=True):
+        """
+        Returns every team score that matches the predicates.
+
+        Parameters:
+            leagueId: league id predicate
+            years: season predicate
+            teams: team abbrev predicate
+            weeks: week predicate
+            completeOnly (bool): leave out the week that was in progress when the league was saved unless the season
+                                 was completed by then, like Fantasy.getScores()
+
+        Returns:
+            scores (list): (league_id, year, week, team_abbrev, score) tuples ordered by league, year and week
+        """
+
+        rows = []
+
+        for side in ('home', 'away'):
+            clause, parameters = where({
+                'b.league_id': leagueId,
+                'b.year': years,
+                'b.' + side + '_abbrev': teams,
+                'b.week': weeks
+            })
+            # the missing side of a playoff bye has no score
+            clause += (" AND " if clause else " WHERE ") + "b." + side + "_abbrev IS NOT NULL"
+            if completeOnly:
+                # whether the current week was final is decided when the league is saved, not when it is read
+                clause += " AND (b.week < l.current_week OR l.completed)"
+
+            sql = ("SELECT b.league_id, b.year, b.week, b." + side + "_abbrev, b." + side + "_score"
+                   " FROM boxscores b JOIN leagues l ON l.league_id = b.league_id AND l.year = b.year" + clause)
+            rows += self.connection.execute(sql, parameters).fetchall()
+
+        return sorted(rows)
+
+
+    def teamSeasons(self, leagueId=None, years=None, teams=None, weeks=None):
+        """
+        Returns the average score and standard deviation of each team in each matching season, e.g. to compare seasons.
+
+        Parameters:
+            leagueId: league id predicate
+            years: season predicate
+            teams: team abbrev predicate
+            weeks: week predicate
+
+        Returns:
+            seasons (dict): dictionary with (league_id, year, team_abbrev) as the key and a dict of weeks,
+                            avgScore and scoreStdDev as the value
+        """
+
+        stats = {}
+        for leagueIdValue, year, _, team, score in self.scores(leagueId, years, teams, weeks):
+            stats.setdefault((leagueIdValue, year, team), RunningStats()).add(score)
+
+        seasons = {}
+        for key, running in stats.items():
+            seasons[key] = {'weeks': running.count, 'avgScore': running.mean, 'scoreStdDev': running.std}
+
+        return seasons
+
+
+    def league(self, leagueId, year):
+        """
+        Returns a stored league season as a WarehouseLeague, so Fantasy(league=warehouse.league(...)) works offline.
+
+        Parameters:
+            leagueId (int): the league id
+            year (int): the season
+
+        Returns:
+            league (WarehouseLeague): the league, or None if it is not in the warehouse
+        """
+
+        found = self.query('leagues', 'current_week, completed', league_id=leagueId, year=year)
+        if not found:
+            return None
+
+        rosters = {}
+        for team, name, position, posRank in self.query('rosters', 'team_abbrev, name, position, pos_rank', league_id=leagueId, year=year):
+            rosters.setdefault(team, []).append(PlayerRecord(name, position, '', posRank, 0.0, team))
+
+        teams = {}
+        for team, teamId, teamName in self.query('teams', 'team_abbrev, team_id, team_name', league_id=leagueId, year=year):
+            teams[team] = TeamRecord(teamId, team, teamName, tuple(rosters.get(team, ())))
+
+        lineups = {}
+        for week, team, name, position, slot, posRank, points in self.query(
+                'lineups', 'week, team_abbrev, name, position, slot_position, pos_rank, points', league_id=leagueId, year=year):
+            lineups.setdefault((week, team), []).append(PlayerRecord(name, position, slot, posRank, points, team))
+
+        boxscores = {}
+        for week, _, home, away, homeScore, awayScore in sorted(self.query(
+                'boxscores', 'week, matchup, home_abbrev, away_abbrev, home_score, away_score', league_id=leagueId, year=year)):
+            boxscores.setdefault(week, []).append(BoxScoreRecord(
+                teams[home], teams.get(away), homeScore, awayScore,
+                tuple(lineups.get((week, home), ())), tuple(lineups.get((week, away), ()))
+            ))
+
+        currentWeek, completed = found[0]
+        return WarehouseLeague(leagueId, year, currentWeek, list(teams.values()), boxscores, bool(completed))
+
+
+    def playerStats(self, season, positions=None, weeks=None, stats=None):
+        """
+        Returns the stored player stats as a wide table in the layout of player_stats.csv: fullName, position
+        and points (of the player's last stored week that matches the weeks), followed by one "<week>_<stat>"
+        column per stat and week.
+
+        Parameters:
+            season (int): the season
+            positions: position predicate
+            weeks: week predicate
+            stats: stat name predicate
+
+        Returns:
+            table (DataFrame): one row per player
+        """
+
+        import pandas as pd
+
+        clause, parameters = where({'p.season': season, 'p.position': positions, 's.week': weeks, 's.stat': stats})
+        long = pd.read_sql_query(
+            "SELECT s.name, s.week, s.stat, s.value FROM player_stats s"
+            " JOIN player_weeks p ON p.season = s.season AND p.name = s.name AND p.week = s.week" + clause,
+            self.connection,
+            params=parameters
+        )
+
+        clause, parameters = where({'season': season, 'position': positions, 'week': weeks})
+        players = pd.read_sql_query(
+            "SELECT name AS fullName, position, points FROM player_weeks" + clause + " ORDER BY name, week",
+            self.connection,
+            params=parameters
+        ).groupby('fullName', sort=False).last().reset_index()
+
+        long['column'] = long['week'].astype(str) + "_" + long['stat']
+        wide = long.pivot_table(index='name', columns='column', values='value', aggfunc='first')
+        wide = wide.reindex(sorted(wide.columns, key=lambda column: int(column.split('_')[0])), axis=1)
+
+        return players.merge(wide, left_on='fullName', right_index=True, how='left')